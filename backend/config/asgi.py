@@ -0,0 +1,8 @@
+import os
+
+from django.core.asgi import get_asgi_application
+
+# ASGI-вариант config.wsgi: для uvicorn (в т.ч. uvicorn.workers.UvicornWorker под gunicorn)
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+
+application = get_asgi_application()
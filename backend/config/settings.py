@@ -44,6 +44,7 @@ INSTALLED_APPS = [
     "django.contrib.staticfiles",
     "django.contrib.sites",
     "django.contrib.sitemaps",
+    "django.contrib.postgres",
     
     # 3rd party - Other
     "parler",
@@ -88,6 +89,9 @@ if DEBUG:
 # MIDDLEWARE
 # ===========================================
 MIDDLEWARE = [
+    # Первыми: замеряют весь запрос, включая остальные middleware
+    "core.middleware.MetricsMiddleware",
+    "core.middleware.ServerTimingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
@@ -241,6 +245,16 @@ STATIC_ROOT = BASE_DIR / "collected_static"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# collectstatic: имена с хэшем содержимого (manifest) + .gz/.br рядом с файлами
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "core.storage.CompressedManifestStaticFilesStorage",
+    },
+}
+
 # Crispy Forms
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
@@ -502,6 +516,21 @@ TINYMCE_ALLOWED_FILE_TYPES = ["jpeg", "jpg", "png", "gif", "webp", "pdf", "doc",
 # Теги / изображения / пагинация
 TAGGIT_CASE_INSENSITIVE = True
 
+# Расчёт стоимости аренды: наценка за субботу и воскресенье, максимум дней в запросе
+QUOTE_WEEKEND_MULTIPLIER = os.getenv("QUOTE_WEEKEND_MULTIPLIER", "1.00")
+QUOTE_MAX_DAYS = int(os.getenv("QUOTE_MAX_DAYS", "90"))
+
+# Доля замеряемых запросов: строка в логе core.timing (0 — выключено).
+# Server-Timing раскрывает устройство бэкенда — заголовок получают только staff,
+# всем — лишь с SERVER_TIMING_HEADER=1 или в DEBUG
+SERVER_TIMING_SAMPLE_RATE = float(os.getenv("SERVER_TIMING_SAMPLE_RATE", "1.0" if DEBUG else "0.01"))
+SERVER_TIMING_HEADER = DEBUG or os.getenv("SERVER_TIMING_HEADER", "0") == "1"
+
+# /metrics: общий каталог процессов (gunicorn-воркеры, deliver_notifications) и токен доступа.
+# Без каталога — метрики только текущего процесса; без токена в production — 404
+METRICS_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR", "")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
 THUMBNAIL_FORMAT = "WEBP"
 THUMBNAIL_QUALITY = 85
 THUMBNAIL_PRESERVE_FORMAT = False
@@ -7,14 +7,8 @@ from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path, re_path
 from django.views.i18n import set_language
-from django.contrib.sitemaps.views import sitemap
 from django.views.generic import TemplateView
-from core.sitemaps import StaticSitemap, CarSitemap
-
-sitemaps = {
-    'static': StaticSitemap,
-    'cars': CarSitemap,
-}
+from core import views as core_views
 
 # --- URLs без языкового префикса ---
 urlpatterns = [
@@ -23,13 +17,17 @@ urlpatterns = [
     # Third-party apps
     path("tinymce/", include("tinymce.urls")),
     path("filer/", include("filer.urls")),
-    path('', include('core.urls')),
     # SEO
-    path("sitemap.xml", sitemap, {"sitemaps": sitemaps}, name="sitemap"),
+    path("sitemap.xml", core_views.sitemap_xml, name="sitemap"),
     path("robots.txt", TemplateView.as_view(template_name="robots.txt", content_type="text/plain"), name="robots"),
+    # Мониторинг
+    path("metrics", core_views.metrics_view, name="metrics"),
 ]
 
 # --- Языковые маршруты ---
+# Страницы сайта подключены только здесь: с prefix_default_language=False
+# английские URL остаются без префикса, а /it/faq/ и т.п. не перехватываются
+# маршрутом car_detail (<category>/<car>/) из неязыкового include
 urlpatterns += i18n_patterns(
     # Core pages
     path("", include("core.urls")),
@@ -1,5 +1,16 @@
-from django.contrib import admin
-from .models import CarCategory, Car, CodeSnippet
+import json
+
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.db import transaction
+from django.http import JsonResponse
+from django.urls import path
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+
+from .models import CarCategory, Car, CarImage, CodeSnippet, LengthDiscount, Notification, Reservation, SeasonalRate
+from .services.car_images import ingest_car_images
+from .services.fleet import reorder_cars
 
 
 @admin.register(CarCategory)
@@ -8,14 +19,87 @@ class CarCategoryAdmin(admin.ModelAdmin):
     prepopulated_fields = {'slug': ('name',)}
 
 
+class CarImageInline(admin.TabularInline):
+    model = CarImage
+    fields = ['field', 'source_url', 'file', 'width', 'height', 'fetched_at']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(Car)
 class CarAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'price_per_day', 'order', 'is_active']
     list_editable = ['order', 'is_active']  # добавь order
     list_filter = ['category', 'is_active']
+    list_select_related = ['category']
     search_fields = ['name']
     prepopulated_fields = {'slug': ('name',)}
     ordering = ['order']
+    inlines = [CarImageInline]
+    actions = ['ingest_images']
+
+    def get_urls(self):
+        urls = [
+            path('reorder/', self.admin_site.admin_view(require_POST(self.reorder_view)), name='core_car_reorder'),
+        ]
+        return urls + super().get_urls()
+
+    def reorder_view(self, request):
+        """Перетаскивание строк в списке: {"order": [pk, ...]} -> один bulk_update"""
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        try:
+            ids = [int(pk) for pk in json.loads(request.body)['order']]
+        except (ValueError, KeyError, TypeError):
+            return JsonResponse({'error': "Expected {\"order\": [pk, ...]}"}, status=400)
+        return JsonResponse({'updated': reorder_cars(ids)})
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # Фото качаем только при изменении URL — обычное сохранение не ждёт сеть.
+        # После коммита: changeform_view не держит транзакцию (и блокировку записи SQLite)
+        # на время скачивания, а сбой загрузки не коммитится вместе с машиной
+        car = form.instance
+        transaction.on_commit(lambda: self._ingest(request, car))
+
+    def _ingest(self, request, car, force=False):
+        try:
+            return ingest_car_images(car, force=force)
+        except Exception as e:
+            self.message_user(request, f"{car}: images not ingested ({e})", messages.WARNING)
+            return 0
+
+    @admin.action(description="Загрузить фото локально")
+    def ingest_images(self, request, queryset):
+        total = sum(self._ingest(request, car, force=True) for car in queryset)
+        self.message_user(request, f"Ingested images: {total}")
+
+
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    list_display = ['car', 'start_date', 'end_date', 'customer', 'created_at']
+    list_filter = ['car']
+    list_select_related = ['car']
+    search_fields = ['car__name', 'customer']
+    date_hierarchy = 'start_date'
+    autocomplete_fields = ['car']
+
+
+@admin.register(SeasonalRate)
+class SeasonalRateAdmin(admin.ModelAdmin):
+    list_display = ['name', 'category', 'start_date', 'end_date', 'multiplier']
+    list_filter = ['category']
+    list_select_related = ['category']
+    date_hierarchy = 'start_date'
+
+
+@admin.register(LengthDiscount)
+class LengthDiscountAdmin(admin.ModelAdmin):
+    list_display = ['min_days', 'percent']
 
 
 # Добавить в backend/core/admin.py
@@ -49,3 +133,20 @@ class CodeSnippetAdmin(admin.ModelAdmin):
         css = {
             'all': ('admin/css/snippets.css',)
         }
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ['__str__', 'source', 'status', 'attempts', 'created_at', 'sent_at']
+    list_filter = ['status', 'source']
+    search_fields = ['message']
+    readonly_fields = ['created_at', 'sent_at', 'attempts', 'last_error', 'delivered_to']
+    actions = ['requeue']
+
+    @admin.action(description="Отправить повторно")
+    def requeue(self, request, queryset):
+        queryset.update(
+            status=Notification.Status.PENDING,
+            attempts=0,
+            next_attempt_at=timezone.now(),
+        )
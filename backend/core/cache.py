@@ -0,0 +1,211 @@
+# backend/core/cache.py
+import hashlib
+import time
+from functools import lru_cache, wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.utils import timezone, translation
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from .timing import measure, record_cache
+
+# Пространства версий: при изменении данных версия увеличивается,
+# и все ключи, построенные на старой версии, просто перестают читаться.
+SNIPPETS = 'snippets'
+CATALOG = 'catalog'
+FLEET = 'fleet'  # только машины: карточки автопарка на главной
+RESERVATIONS = 'reservations'  # брони: занятость машин по датам
+RATES = 'rates'  # сезонные тарифы и скидки за длительность
+NAMESPACES = (SNIPPETS, CATALOG, FLEET, RESERVATIONS, RATES)
+
+# Страницы каталога живут долго: актуальность обеспечивает версия CATALOG
+PAGE_TIMEOUT = 60 * 60 * 6
+FRAGMENT_TIMEOUT = 60 * 60 * 24
+
+# Подставляется вместо CSRF-токена в кэшируемый HTML и заменяется
+# на токен конкретного посетителя при отдаче
+CSRF_PLACEHOLDER = 'csrfplaceholder0000000000000000000000000000000000000000000000000'
+
+
+def _version_key(namespace):
+    return f'core:version:{namespace}'
+
+
+def _modified_key(namespace):
+    return f'core:modified:{namespace}'
+
+
+def _initial_version():
+    # Версия от времени: если ключ версии вытеснен из кэша,
+    # новая версия не совпадёт ни с одной из старых
+    return int(time.time() * 1000)
+
+
+def get_version(namespace):
+    """Текущая версия пространства кэша (создаётся при первом обращении)"""
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        version = _initial_version()
+        if not cache.add(key, version, None):
+            # Другой процесс успел создать версию раньше
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(namespace):
+    """Инвалидирует все ключи пространства одной операцией, без перебора ключей"""
+    key = _version_key(namespace)
+    cache.set(_modified_key(namespace), int(time.time()), None)
+    try:
+        return cache.incr(key)
+    except ValueError:
+        version = _initial_version()
+        cache.set(key, version, None)
+        return version
+
+
+def get_last_modified(namespace):
+    """Время последнего изменения пространства (unix time).
+
+    Если отметка потеряна, считаем, что изменение было только что —
+    клиенты один раз получат страницу целиком, но никогда не устаревшую.
+    """
+    key = _modified_key(namespace)
+    modified = cache.get(key)
+    if modified is None:
+        modified = int(time.time())
+        if not cache.add(key, modified, None):
+            modified = cache.get(key, modified)
+    return modified
+
+
+def get_language_bucket(language=None):
+    """Сводит код языка к одному из settings.LANGUAGES (en-us -> en, fr -> en)"""
+    language = language or translation.get_language() or settings.LANGUAGE_CODE
+    try:
+        return translation.get_supported_language_variant(language)
+    except LookupError:
+        return settings.LANGUAGE_CODE
+
+
+@lru_cache(maxsize=None)
+def _templates_version():
+    """Хэш исходников шаблонов: после деплоя старые фрагменты не читаются"""
+    digest = hashlib.md5()
+    for directory in settings.TEMPLATES[0]['DIRS']:
+        for path in sorted(Path(directory).rglob('*.html')):
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+
+@lru_cache(maxsize=None)
+def _build_version():
+    """Шаблоны + манифест статики процесса: после деплоя старый HTML со старыми
+    хэшированными именами CSS/JS не читается из кэша и не получает 304"""
+    manifest = getattr(staticfiles_storage, 'manifest_hash', '') or ''
+    return f'{_templates_version()}.{manifest[:12]}'
+
+
+def fragment_key(name, depends=()):
+    """Ключ фрагмента шаблона: язык, дата и версии пространств, от которых он зависит"""
+    versions = '.'.join(str(get_version(namespace)) for namespace in depends)
+    return 'core:fragment:{}:{}:{}:{}:{}'.format(
+        _build_version(),
+        name,
+        get_language_bucket(),
+        timezone.localdate().isoformat(),
+        versions,
+    )
+
+
+def _page_key(request):
+    url = hashlib.md5(f'{request.get_host()}{request.path}'.encode()).hexdigest()
+    # Ключ по языку из settings.LANGUAGES, а не по сырому Accept-Language:
+    # не больше одной копии страницы на поддерживаемый язык
+    # Дата в ключе — шаблоны выводят {% now %} (дата в форме бронирования)
+    return 'core:page:{}:{}:{}:{}:{}'.format(
+        _build_version(),
+        get_version(CATALOG),
+        get_language_bucket(),
+        timezone.localdate().isoformat(),
+        url,
+    )
+
+
+def _validators(key):
+    """ETag и Last-Modified страницы без обращения к БД"""
+    etag = '"{}"'.format(hashlib.md5(key.encode()).hexdigest())
+    # Страница меняется и в полночь ({% now %}), поэтому не раньше начала дня
+    today = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    last_modified = max(get_last_modified(CATALOG), int(today.timestamp()))
+    return etag, last_modified
+
+
+def _finalize(request, content, content_type, validators, status=200):
+    placeholder = CSRF_PLACEHOLDER.encode()
+    if placeholder in content:
+        content = content.replace(placeholder, get_token(request).encode())
+    response = HttpResponse(content, content_type=content_type, status=status)
+    # Vary: Accept-Language добавляет LocaleMiddleware, и только для URL без
+    # языкового префикса; для /it/... язык однозначно задан путём
+    response['Content-Language'] = get_language_bucket()
+    etag, last_modified = validators
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # В HTML CSRF-токен посетителя: только приватный кэш и всегда с ревалидацией
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def cache_catalog_page(timeout=PAGE_TIMEOUT):
+    """Кэш страниц, зависящих от каталога (Car, CarCategory, CodeSnippet).
+
+    View должна вернуть TemplateResponse: HTML рендерится с CSRF-заглушкой,
+    поэтому одна копия страницы подходит всем посетителям. Инвалидация —
+    через bump_version(CATALOG), одинаково для Redis и LocMem. Условные
+    запросы (If-None-Match / If-Modified-Since) получают 304 до вызова view.
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+
+            key = _page_key(request)
+            validators = _validators(key)
+            # 304 до рендеринга и до запросов к БД во view
+            not_modified = get_conditional_response(
+                request, etag=validators[0], last_modified=validators[1],
+            )
+            if not_modified is not None:
+                not_modified['ETag'] = validators[0]
+                patch_cache_control(not_modified, private=True, no_cache=True)
+                return not_modified
+
+            cached = cache.get(key)
+            record_cache('page', cached is not None)
+            if cached is not None:
+                return _finalize(request, *cached, validators)
+
+            response = view_func(request, *args, **kwargs)
+            if not hasattr(response, 'render') or response.status_code != 200:
+                return response
+
+            response.context_data = {
+                **(response.context_data or {}),
+                'csrf_token': CSRF_PLACEHOLDER,
+            }
+            with measure('tpl'):
+                response.render()
+            cached = (response.content, response['Content-Type'])
+            cache.set(key, cached, timeout)
+            return _finalize(request, *cached, validators)
+        return wrapper
+    return decorator
@@ -1,21 +1,23 @@
 # backend/core/context_processors.py
 
-from .models import CodeSnippet
+from .services import get_snippet_index
+from .timing import timed
 
+
+@timed('cp')
 def code_snippets(request):
     """Добавляет code snippets в контекст всех шаблонов"""
-    path = request.path
-    
-    snippets = CodeSnippet.objects.filter(is_active=True)
+    snippets = get_snippet_index().resolve(request.path)
     
     return {
-        'snippets_head_start': [s for s in snippets if s.location == 'head_start' and s.should_show_on_path(path)],
-        'snippets_head_end': [s for s in snippets if s.location == 'head_end' and s.should_show_on_path(path)],
-        'snippets_body_start': [s for s in snippets if s.location == 'body_start' and s.should_show_on_path(path)],
-        'snippets_body_end': [s for s in snippets if s.location == 'body_end' and s.should_show_on_path(path)],
+        'snippets_head_start': snippets['head_start'],
+        'snippets_head_end': snippets['head_end'],
+        'snippets_body_start': snippets['body_start'],
+        'snippets_body_end': snippets['body_end'],
     }
 
 
+@timed('cp')
 def site_settings(request):
     """Глобальные настройки сайта"""
     return {
@@ -0,0 +1,111 @@
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from taggit.models import Tag
+
+from core.models import Car, CarCategory, TaggedCar
+from core.services.search import SearchIndex, document, postgres_search, update_search_vectors
+
+BRANDS = {
+    'Lamborghini': ['Urus', 'Huracan', 'Revuelto'],
+    'Ferrari': ['296 GTB', 'Roma', 'Purosangue', 'SF90'],
+    'Mercedes-AMG': ['G 63', 'GT 63', 'S 63'],
+    'Porsche': ['911 Turbo S', 'Cayenne', 'Taycan'],
+    'Rolls-Royce': ['Cullinan', 'Ghost', 'Spectre'],
+    'BMW': ['X5', 'X7', 'M8'],
+}
+CATEGORIES = ['SUV', 'Sport', 'Sedan', 'Convertible', 'Van']
+TAGS = ['Exclusive', 'Hybrid', 'Sport', 'Chauffeur', 'Airport', 'Electric']
+WORDS = (
+    'luxury comfortable powerful elegant drive milan lake como airport transfer '
+    'leather interior panoramic roof wedding events business travel'
+).split()
+
+DEFAULT_QUERIES = [
+    'lamborghini urus', '7 seats suv', 'ferrari', 'porsche cayenne hybrid',
+    'rolls', 'lamborgini', 'electric chauffeur', 'milan wedding convertible',
+]
+
+
+class Command(BaseCommand):
+    help = "Замер поиска по автопарку на синтетических данных (транзакция откатывается)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cars', type=int, default=3000)
+        parser.add_argument('--repeat', type=int, default=50, help="Повторов каждого запроса")
+        parser.add_argument('--max-p95', type=float, default=10.0, help="Порог p95, мс")
+        parser.add_argument('--seed', type=int, default=24)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            cars = self._generate(rng, options['cars'])
+            search = self._prepare(cars)
+
+            worst = 0
+            for query in DEFAULT_QUERIES:
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    ids = search(query)
+                    timings.append((time.perf_counter() - started) * 1000)
+                timings.sort()
+                p95 = timings[int(len(timings) * 0.95) - 1]
+                worst = max(worst, p95)
+                self.stdout.write(
+                    f"{query!r:32} hits={len(ids):3}  p50={statistics.median(timings):6.2f}ms  p95={p95:6.2f}ms"
+                )
+            transaction.set_rollback(True)
+
+        if worst > options['max_p95']:
+            raise CommandError(f"p95 {worst:.2f}ms exceeds {options['max_p95']}ms")
+        self.stdout.write(self.style.SUCCESS(f"OK: worst p95 {worst:.2f}ms"))
+
+    def _generate(self, rng, count):
+        categories = [
+            CarCategory.objects.create(name=name, slug=f'bench-{name.lower()}') for name in CATEGORIES
+        ]
+        tags = [Tag.objects.get_or_create(name=name)[0] for name in TAGS]
+
+        cars = []
+        for i in range(count):
+            brand = rng.choice(list(BRANDS))
+            name = f'{brand} {rng.choice(BRANDS[brand])}'
+            cars.append(Car(
+                category=rng.choice(categories),
+                name=name,
+                slug=f'bench-{i}',
+                description=' '.join(rng.choices(WORDS, k=30)),
+                price_per_day=Decimal(rng.randrange(300, 3000, 50)),
+                main_image='https://example.com/car.jpg',
+                seats=rng.choice([2, 4, 5, 7]),
+                order=i,
+            ))
+        cars = Car.objects.bulk_create(cars, batch_size=500)
+
+        links = [
+            TaggedCar(content_object=car, tag=tag)
+            for car in cars for tag in rng.sample(tags, k=rng.randint(0, 3))
+        ]
+        TaggedCar.objects.bulk_create(links, batch_size=500)
+        return Car.objects.filter(slug__startswith='bench-')
+
+    def _prepare(self, cars):
+        started = time.perf_counter()
+        if connection.vendor == 'postgresql':
+            update_search_vectors(cars)
+            self.stdout.write(f"tsvector built in {time.perf_counter() - started:.1f}s ({connection.vendor})")
+            return lambda query: postgres_search(cars, query, 20)
+
+        index = SearchIndex(
+            (car.pk, document(
+                car.name, car.category.name, car.get_tags_list(), car.seats, car.transmission, car.description,
+            ))
+            for car in cars.select_related('category').prefetch_related('tagged_items__tag')
+        )
+        self.stdout.write(f"In-memory index built in {(time.perf_counter() - started) * 1000:.0f}ms ({connection.vendor})")
+        return lambda query: index.search(query, 20)
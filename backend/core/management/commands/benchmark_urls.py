@@ -0,0 +1,234 @@
+import datetime
+import json
+import random
+import statistics
+import time
+from decimal import Decimal
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLResolver, get_resolver
+from django.utils import timezone
+from taggit.models import Tag
+
+from core.cache import NAMESPACES, bump_version
+from core.models import Car, CarCategory, LengthDiscount, Reservation, SeasonalRate, TaggedCar
+from core.services.email_domains import VALID
+
+from .benchmark_search import BRANDS, CATEGORIES, TAGS, WORDS
+
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / 'benchmark_baseline.json'
+
+# Маршруты без замера (кроме admin): служебные и сторонних приложений (tinymce, filer)
+SKIP_ROUTES = {'set_language', 'tinymce-linklist', 'tinymce-compressor', 'tinymce-filebrowser', 'canonical'}
+# Префикс ключей кэша: версии и страницы синтетики не смешиваются с рабочими
+CACHE_PREFIX = 'benchmark_urls'
+METRICS_TOKEN = 'benchmark'
+
+
+class Command(BaseCommand):
+    help = (
+        "Замер всех публичных URL тестовым клиентом на синтетических данных во временной тестовой БД "
+        "и отдельном префиксе кэша: "
+        "p50/p95, число SQL-запросов и размер ответа; сравнение с JSON-базой"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--cars', type=int, default=60)
+        parser.add_argument('--repeat', type=int, default=30, help="Замеров на URL")
+        parser.add_argument('--warmup', type=int, default=3, help="Прогревочных запросов на URL")
+        parser.add_argument('--baseline', default=str(DEFAULT_BASELINE))
+        parser.add_argument('--write-baseline', action='store_true', help="Сохранить результат как новую базу")
+        parser.add_argument('--threshold', type=float, default=0.25, help="Допустимый рост p95, доля (0.25 = +25%%)")
+        parser.add_argument(
+            '--min-delta', type=float, default=1.0, help="Рост p95 меньше стольких мс не считается регрессией",
+        )
+        parser.add_argument('--seed', type=int, default=24)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        # Тестовый клиент шлёт токен /metrics во всех запросах; остальные view его не читают
+        client = Client(HTTP_AUTHORIZATION=f'Bearer {METRICS_TOKEN}')
+        results = {}
+        # Синтетика — в тестовой БД (как manage.py test): рабочая БД не держит
+        # транзакцию записи весь прогон и не видит тысяч строк
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # DNS: домен email всегда существует. Telegram в запросе не вызывается — формы пишут в outbox.
+            # Кэш с отдельным префиксом: рабочие версии не сбрасываются. METRICS_DIR пуст —
+            # замеры не попадают в метрики рабочих процессов. Server-Timing выключен:
+            # замер без его накладных расходов и строк в логе
+            with mock.patch('core.services.email_domains._lookup', return_value=VALID), \
+                    override_settings(
+                        CACHES=self._isolated_caches(),
+                        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+                        SERVER_TIMING_SAMPLE_RATE=0,
+                        METRICS_DIR='',
+                        METRICS_TOKEN=METRICS_TOKEN,
+                    ):
+                # Страницы прошлого прогона под тем же префиксом собраны из других данных
+                for namespace in NAMESPACES:
+                    bump_version(namespace)
+                fixtures = self._seed(rng, options['cars'])
+                scenarios = self._scenarios(fixtures)
+                self._check_coverage(scenarios)
+                for name, method, url, data in scenarios:
+                    results[name] = self._measure(client, method, url, data, options)
+                    self._report(name, results[name])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        baseline_path = Path(options['baseline'])
+        if options['write_baseline']:
+            baseline_path.write_text(json.dumps({'scenarios': results}, indent=2, sort_keys=True) + '\n')
+            self.stdout.write(self.style.SUCCESS(f"Baseline written to {baseline_path}"))
+            return
+        if not baseline_path.exists():
+            self.stdout.write(f"No baseline at {baseline_path}; run with --write-baseline to create one")
+            return
+
+        failures = self._compare(json.loads(baseline_path.read_text())['scenarios'], results, options)
+        if failures:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(failures))
+        self.stdout.write(self.style.SUCCESS(f"OK: no regressions against {baseline_path}"))
+
+    def _isolated_caches(self):
+        caches = {alias: dict(config) for alias, config in settings.CACHES.items()}
+        for config in caches.values():
+            config['KEY_PREFIX'] = CACHE_PREFIX
+        return caches
+
+    def _seed(self, rng, count):
+        categories = [
+            CarCategory.objects.create(name=name, slug=f'bench-{name.lower()}') for name in CATEGORIES
+        ]
+        tags = [Tag.objects.get_or_create(name=name)[0] for name in TAGS]
+
+        cars = []
+        for i in range(count):
+            brand = rng.choice(list(BRANDS))
+            cars.append(Car(
+                category=rng.choice(categories),
+                name=f'{brand} {rng.choice(BRANDS[brand])}',
+                slug=f'bench-{i}',
+                description=' '.join(rng.choices(WORDS, k=30)),
+                price_per_day=Decimal(rng.randrange(300, 3000, 50)),
+                main_image='https://example.com/car.jpg',
+                seats=rng.choice([2, 4, 5, 7]),
+                order=i,
+            ))
+        cars = Car.objects.bulk_create(cars)
+        TaggedCar.objects.bulk_create([
+            TaggedCar(content_object=car, tag=tag) for car in cars for tag in rng.sample(tags, k=rng.randint(1, 3))
+        ])
+
+        today = timezone.localdate()
+        Reservation.objects.bulk_create([
+            Reservation(
+                car=car,
+                start_date=today + datetime.timedelta(days=offset),
+                end_date=today + datetime.timedelta(days=offset + rng.randint(1, 7)),
+            )
+            for car, offset in ((rng.choice(cars), offset) for offset in range(0, 60, 3))
+        ])
+        SeasonalRate.objects.create(
+            name='Bench summer', start_date=today + datetime.timedelta(days=10),
+            end_date=today + datetime.timedelta(days=40), multiplier=Decimal('1.30'),
+        )
+        LengthDiscount.objects.create(min_days=7, percent=Decimal('10.00'))
+        return {'car': cars[0], 'tag': tags[0], 'today': today}
+
+    def _scenarios(self, fixtures):
+        car, tag, today = fixtures['car'], fixtures['tag'], fixtures['today']
+        start, end = today + datetime.timedelta(days=5), today + datetime.timedelta(days=12)
+        dates = f'start={start.isoformat()}&end={end.isoformat()}'
+        form = {'full_phone': '+39 333 123 4567', 'email': 'bench@example.com', 'phone': '+39 333 123 4567'}
+        return [
+            ('index', 'get', '/', None),
+            ('index_it', 'get', '/it/', None),
+            ('contacts', 'get', '/contacts/', None),
+            ('cookies', 'get', '/cookies/', None),
+            ('privacy', 'get', '/privacy-policy/', None),
+            ('faq', 'get', '/faq/', None),
+            ('car_detail', 'get', Car.objects.select_related('category').get(pk=car.pk).get_absolute_url(), None),
+            ('tag_cars', 'get', f'/tags/{tag.slug}/', None),
+            ('sitemap', 'get', '/sitemap.xml', None),
+            ('robots', 'get', '/robots.txt', None),
+            ('metrics', 'get', '/metrics', None),
+            ('cars_api', 'get', '/api/cars/?limit=24', None),
+            ('search_api', 'get', '/api/search/?q=ferrari', None),
+            ('availability_api', 'get', f'/api/availability/?{dates}', None),
+            ('quote_api', 'get', f'/api/quote/?{dates}', None),
+            ('booking_request', 'post', '/api/booking/', dict(form, location='Milan', date=start.isoformat())),
+            ('contact_request', 'post', '/api/contact/', dict(form, first_name='Bench', message='Hello')),
+            ('car_request', 'post', '/api/car-request/', dict(form, car_name=car.name)),
+        ]
+
+    def _check_coverage(self, scenarios):
+        """Новый маршрут в корневом URLconf без сценария — ошибка, а не тихий пропуск"""
+        measured = {name for name, *_ in scenarios}
+        missing = set(self._routes(get_resolver().url_patterns)) - measured - SKIP_ROUTES
+        if missing:
+            raise CommandError(f"No benchmark scenario for routes: {', '.join(sorted(missing))}")
+
+    def _routes(self, patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                if pattern.namespace != 'admin':
+                    yield from self._routes(pattern.url_patterns)
+            elif pattern.name:
+                yield pattern.name
+
+    def _measure(self, client, method, url, data, options):
+        request = getattr(client, method)
+        cold = None
+        for i in range(options['warmup']):
+            started = time.perf_counter()
+            response = request(url, data) if data else request(url)
+            if i == 0:
+                cold = (time.perf_counter() - started) * 1000
+            if response.status_code != 200:
+                raise CommandError(f"{method.upper()} {url}: status {response.status_code}")
+
+        timings = []
+        queries = 0
+        for _ in range(options['repeat']):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = request(url, data) if data else request(url)
+                timings.append((time.perf_counter() - started) * 1000)
+            queries = max(queries, len(captured))
+        timings.sort()
+        return {
+            'url': url,
+            'method': method.upper(),
+            'cold_ms': round(cold, 3) if cold is not None else None,
+            'p50_ms': round(statistics.median(timings), 3),
+            'p95_ms': round(timings[max(int(len(timings) * 0.95) - 1, 0)], 3),
+            'queries': queries,
+            'bytes': len(response.content),
+        }
+
+    def _report(self, name, result):
+        self.stdout.write(
+            f"{name:18} {result['method']:4} p50={result['p50_ms']:7.2f}ms  p95={result['p95_ms']:7.2f}ms  "
+            f"queries={result['queries']:2}  bytes={result['bytes']:7}"
+        )
+
+    def _compare(self, baseline, results, options):
+        failures = []
+        for name, result in results.items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            limit = base['p95_ms'] * (1 + options['threshold'])
+            if result['p95_ms'] > limit and result['p95_ms'] - base['p95_ms'] > options['min_delta']:
+                failures.append(f"{name}: p95 {result['p95_ms']:.2f}ms > {limit:.2f}ms (baseline {base['p95_ms']:.2f}ms)")
+            if result['queries'] > base['queries']:
+                failures.append(f"{name}: {result['queries']} SQL queries (baseline {base['queries']})")
+        return failures
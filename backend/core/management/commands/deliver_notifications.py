@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.services.notifications import MAX_ATTEMPTS, deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Доставка заявок из outbox в Telegram (ретраи с backoff, dead-letter)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Обработать очередь и выйти")
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--interval', type=float, default=2.0, help="Пауза при пустой очереди, сек")
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS)
+
+    def handle(self, *args, **options):
+        self.stdout.write("Notification worker started")
+        try:
+            while True:
+                sent, failed = deliver_pending(options['batch_size'], options['max_attempts'])
+                if sent or failed:
+                    self.stdout.write(f"Delivered: {sent}, failed: {failed}")
+                # Полная пачка — сразу берём следующую, иначе ждём
+                if sent + failed < options['batch_size']:
+                    if options['once']:
+                        break
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write("Notification worker stopped")
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Car
+from core.services.fleet_io import FORMATS, export_rows, write_rows
+
+from .fleet_import import guess_format
+
+
+class Command(BaseCommand):
+    help = "Выгрузка автопарка в CSV/JSON Lines (потоково, формат как у fleet_import)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', default='-', help="Файл или '-' для stdout")
+        parser.add_argument('--format', choices=FORMATS, help="По умолчанию — по расширению файла")
+        parser.add_argument('--active', action='store_true', help="Только активные машины")
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = options['format'] or ('jsonl' if path == '-' else guess_format(path))
+        cars = Car.objects.filter(is_active=True) if options['active'] else Car.objects.all()
+        rows = export_rows(cars)
+        if path == '-':
+            write_rows(rows, self.stdout, fmt)
+            return
+        with open(path, 'w', newline='', encoding='utf-8') as stream:
+            write_rows(rows, stream, fmt)
+
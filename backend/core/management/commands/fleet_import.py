@@ -0,0 +1,36 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.services.fleet_io import BATCH_SIZE, FORMATS, FleetImportError, import_rows, read_rows
+
+
+class Command(BaseCommand):
+    help = "Импорт автопарка из CSV/JSON Lines: upsert по slug пачками (все строки или ни одной)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Файл или '-' для stdin")
+        parser.add_argument('--format', choices=FORMATS, help="По умолчанию — по расширению файла")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        fmt = options['format'] or guess_format(options['path'])
+        started = time.perf_counter()
+        try:
+            if options['path'] == '-':
+                count = import_rows(read_rows(sys.stdin, fmt), options['batch_size'])
+            else:
+                with open(options['path'], newline='', encoding='utf-8') as stream:
+                    count = import_rows(read_rows(stream, fmt), options['batch_size'])
+        except (FleetImportError, OSError) as e:
+            raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(f"Imported {count} rows in {time.perf_counter() - started:.1f}s"))
+
+
+def guess_format(path):
+    if path.endswith('.csv'):
+        return 'csv'
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    raise CommandError("Cannot guess format from the file name, use --format")
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Car
+from core.services.car_images import ingest_car_images
+
+
+class Command(BaseCommand):
+    help = "Загрузка фото машин с удалённых URL в MEDIA_ROOT с WebP-вариантами"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Перекачать даже неизменившиеся фото")
+        parser.add_argument('--car', help="Slug одной машины")
+
+    def handle(self, *args, **options):
+        cars = Car.objects.prefetch_related('local_images')
+        if options['car']:
+            cars = cars.filter(slug=options['car'])
+
+        total = errors = 0
+        for car in cars:
+            try:
+                total += ingest_car_images(car, force=options['force'])
+            except Exception as e:
+                errors += 1
+                self.stderr.write(f"{car.slug}: {e}")
+        self.stdout.write(self.style.SUCCESS(f"Ingested images: {total}, failed cars: {errors}"))
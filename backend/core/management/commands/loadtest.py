@@ -0,0 +1,305 @@
+import asyncio
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from importlib.util import find_spec
+from pathlib import Path
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+# Конфигурации сервера: имя -> аргументы gunicorn (config.wsgi, если не указано иное)
+SERVERS = {
+    'sync-2': ['--workers', '2'],
+    'sync-4': ['--workers', '4'],
+    'gthread-2x4': ['--workers', '2', '--worker-class', 'gthread', '--threads', '4'],
+    'gthread-4x4': ['--workers', '4', '--worker-class', 'gthread', '--threads', '4'],
+    'uvicorn-2': ['--workers', '2', '--worker-class', 'uvicorn.workers.UvicornWorker'],
+}
+DEFAULT_SERVERS = 'sync-2,sync-4,gthread-2x4,uvicorn-2'
+
+# Смесь запросов: (вес, вид)
+MIX = [
+    (40, 'index'),
+    (35, 'car'),
+    (10, 'page'),
+    (10, 'api'),
+    (5, 'form'),
+]
+PAGES = ['/contacts/', '/faq/', '/privacy-policy/', '/it/']
+BOOT_TIMEOUT = 30
+REQUEST_TIMEOUT = 10
+
+_LOC_RE = re.compile(r'<loc>([^<]+)</loc>')
+_COOKIE_RE = re.compile(r'csrftoken=([^;\s]+)')
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _rss_kb(pid):
+    """RSS процесса из /proc (Linux); None, если недоступно"""
+    try:
+        for line in Path(f'/proc/{pid}/status').read_text().splitlines():
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    except OSError:
+        return None
+    return None
+
+
+def _children(pid):
+    children = []
+    for stat in Path('/proc').glob('[0-9]*/stat'):
+        try:
+            # pid (comm) state ppid ... — comm может содержать пробелы
+            ppid = int(stat.read_text().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == pid:
+            children.append(int(stat.parent.name))
+    return children
+
+
+async def _fetch(port, method, path, body=b'', headers=None):
+    """Один HTTP/1.1-запрос с Connection: close: (status, заголовки, тело)"""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    lines = [f'{method} {path} HTTP/1.1', f'Host: 127.0.0.1:{port}', 'Connection: close']
+    lines += [f'{name}: {value}' for name, value in (headers or {}).items()]
+    if body:
+        lines.append(f'Content-Length: {len(body)}')
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode() + body)
+    await writer.drain()
+    data = await reader.read()
+    writer.close()
+    head, _, content = data.partition(b'\r\n\r\n')
+    head = head.decode('latin-1')
+    return int(head.split(' ', 2)[1]), head, content
+
+
+class Command(BaseCommand):
+    help = (
+        "Нагрузочный тест локально: поднимает gunicorn в нескольких конфигурациях и прогоняет "
+        "смесь запросов (главная, машины, формы); throughput, перцентили и RSS воркеров"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', default=DEFAULT_SERVERS, help=f"Через запятую из: {', '.join(SERVERS)}")
+        parser.add_argument('--concurrency', type=int, default=16, help="Одновременных клиентов")
+        parser.add_argument('--duration', type=float, default=20.0, help="Секунд нагрузки на конфигурацию")
+        parser.add_argument('--warmup', type=float, default=3.0, help="Секунд прогрева (не учитываются)")
+        parser.add_argument('--redis', default='auto', help="auto (локальный redis-server), none или redis:// URL")
+        parser.add_argument(
+            '--database-url', help="БД для серверов. По умолчанию — временная копия SQLite; для PostgreSQL "
+                                   "без этого параметра формы исключаются из смеси (заявки попали бы в outbox)",
+        )
+        parser.add_argument('--json', help="Сохранить результаты в файл")
+        parser.add_argument('--seed', type=int, default=24)
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['servers'].split(',') if name.strip()]
+        unknown = set(names) - set(SERVERS)
+        if unknown:
+            raise CommandError(f"Unknown servers: {', '.join(sorted(unknown))}")
+
+        with tempfile.TemporaryDirectory(prefix='loadtest-') as tmp:
+            tmp = Path(tmp)
+            env, forms = self._environment(options, tmp)
+            redis = self._start_redis(options['redis'], env)
+            try:
+                results = {}
+                for name in names:
+                    if 'uvicorn' in ' '.join(SERVERS[name]) and find_spec('uvicorn') is None:
+                        self.stdout.write(f"{name}: skipped, uvicorn is not installed")
+                        continue
+                    results[name] = self._run_server(name, env, forms, tmp / f'{name}.log', options)
+                    self._report(name, results[name])
+            finally:
+                if redis is not None:
+                    redis.terminate()
+                    redis.wait()
+
+        if options['json']:
+            Path(options['json']).write_text(json.dumps(results, indent=2) + '\n')
+            self.stdout.write(f"Results written to {options['json']}")
+
+    def _environment(self, options, tmp):
+        env = dict(os.environ, DEBUG='False', PYTHONUNBUFFERED='1')
+        env['ALLOWED_HOSTS'] = ' '.join([*settings.ALLOWED_HOSTS, '127.0.0.1'])
+        # Заявки из форм не должны уйти в Telegram
+        env.pop('TELEGRAM_BOT_TOKEN', None)
+
+        if options['database_url']:
+            env['DATABASE_URL'] = options['database_url']
+            return env, True
+        if connection.vendor == 'sqlite':
+            copy = tmp / 'db.sqlite3'
+            shutil.copy(connection.settings_dict['NAME'], copy)
+            env['DATABASE_URL'] = f'sqlite:///{copy}'
+            return env, True
+        self.stdout.write("Forms excluded from the mix: pass --database-url with a scratch database to include them")
+        return env, False
+
+    def _start_redis(self, mode, env):
+        if mode == 'none':
+            env.pop('REDIS_URL', None)
+            return None
+        if mode != 'auto':
+            env['REDIS_URL'] = mode
+            return None
+        binary = shutil.which('redis-server')
+        if binary is None:
+            env.pop('REDIS_URL', None)
+            self.stdout.write("redis-server not found: LocMem cache, separate per worker")
+            return None
+        port = _free_port()
+        process = subprocess.Popen(
+            [binary, '--port', str(port), '--save', '', '--appendonly', 'no'],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        env['REDIS_URL'] = f'redis://127.0.0.1:{port}/1'
+        return process
+
+    def _run_server(self, name, env, forms, log_path, options):
+        port = _free_port()
+        args = SERVERS[name]
+        app = 'config.asgi:application' if 'uvicorn' in ' '.join(args) else 'config.wsgi:application'
+        with open(log_path, 'wb') as log:
+            server = subprocess.Popen(
+                [sys.executable, '-m', 'gunicorn', app, '--bind', f'127.0.0.1:{port}', *args],
+                cwd=settings.BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT,
+            )
+        try:
+            return asyncio.run(self._load(server, port, forms, log_path, options))
+        finally:
+            server.terminate()
+            try:
+                server.wait(BOOT_TIMEOUT)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+    async def _boot(self, server, port, log_path):
+        deadline = time.monotonic() + BOOT_TIMEOUT
+        while time.monotonic() < deadline:
+            if server.poll() is not None:
+                raise CommandError(f"Server exited:\n{log_path.read_text()[-2000:]}")
+            try:
+                await _fetch(port, 'GET', '/robots.txt')
+                return
+            except OSError:
+                await asyncio.sleep(0.2)
+        raise CommandError(f"Server did not start in {BOOT_TIMEOUT}s")
+
+    async def _requests(self, port, forms):
+        """Генератор запросов смеси; адреса машин — из sitemap.xml самого сервера"""
+        _, head, _ = await _fetch(port, 'GET', '/contacts/')
+        match = _COOKIE_RE.search(head)
+        token = match.group(1) if match else ''
+
+        _, _, sitemap = await _fetch(port, 'GET', '/sitemap.xml')
+        cars = [
+            path for path in (urlsplit(url).path for url in _LOC_RE.findall(sitemap.decode('utf-8', 'replace')))
+            if path.count('/') == 3 and not path.startswith(('/it/', '/tags/'))
+        ]
+
+        form = urlencode({
+            'full_phone': '+39 333 123 4567', 'email': 'loadtest@gmail.com', 'location': 'Milan',
+        }).encode()
+        form_headers = {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Cookie': f'csrftoken={token}',
+            'X-CSRFToken': token,
+        }
+
+        def pick(rng):
+            kinds = [kind for weight, kind in MIX for _ in range(weight)]
+            while True:
+                kind = rng.choice(kinds)
+                if kind == 'index':
+                    yield 'index', ('GET', '/', b'', None)
+                elif kind == 'car' and cars:
+                    yield 'car', ('GET', rng.choice(cars), b'', None)
+                elif kind == 'page':
+                    yield 'page', ('GET', rng.choice(PAGES), b'', None)
+                elif kind == 'api':
+                    yield 'api', ('GET', rng.choice(['/api/cars/', '/api/search/?q=suv']), b'', None)
+                elif kind == 'form' and forms:
+                    yield 'form', ('POST', '/api/booking/', form, form_headers)
+        return pick
+
+    async def _load(self, server, port, forms, log_path, options):
+        await self._boot(server, port, log_path)
+        pick = await self._requests(port, forms)
+        samples = []
+        errors = []
+
+        async def client(rng, until, record):
+            requests = pick(rng)
+            while time.monotonic() < until:
+                kind, (method, path, body, headers) = next(requests)
+                started = time.perf_counter()
+                try:
+                    status, _, content = await asyncio.wait_for(
+                        _fetch(port, method, path, body, headers), REQUEST_TIMEOUT,
+                    )
+                except (OSError, asyncio.TimeoutError, ValueError, IndexError) as e:
+                    if record:
+                        errors.append(type(e).__name__)
+                    continue
+                if record:
+                    samples.append((kind, (time.perf_counter() - started) * 1000, status, len(content)))
+
+        base = random.Random(options['seed'])
+        for phase, record in ((options['warmup'], False), (options['duration'], True)):
+            until = time.monotonic() + phase
+            await asyncio.gather(*(
+                client(random.Random(base.random()), until, record) for _ in range(options['concurrency'])
+            ))
+
+        workers = _children(server.pid)
+        rss = [kb for kb in map(_rss_kb, workers) if kb is not None]
+        timings = sorted(sample[1] for sample in samples)
+        # 4xx — ответы приложения (например, формы без сети отклонят домен email), не сбои сервера
+        client_errors = sum(1 for sample in samples if 400 <= sample[2] < 500)
+        failed = sum(1 for sample in samples if sample[2] >= 500) + len(errors)
+
+        def percentile(values, q):
+            return round(values[min(int(len(values) * q), len(values) - 1)], 2) if values else None
+
+        return {
+            'requests': len(samples),
+            'rps': round(len(samples) / options['duration'], 1),
+            'errors': failed,
+            'status_4xx': client_errors,
+            'p50_ms': percentile(timings, 0.50),
+            'p95_ms': percentile(timings, 0.95),
+            'p99_ms': percentile(timings, 0.99),
+            'by_kind_p95_ms': {
+                kind: percentile(sorted(sample[1] for sample in samples if sample[0] == kind), 0.95)
+                for kind in sorted({sample[0] for sample in samples})
+            },
+            'workers': len(workers),
+            'worker_rss_mb': round(statistics.mean(rss) / 1024, 1) if rss else None,
+            'total_rss_mb': round((sum(rss) + (_rss_kb(server.pid) or 0)) / 1024, 1) if rss else None,
+        }
+
+    def _report(self, name, result):
+        self.stdout.write(
+            f"{name:12} {result['rps']:8.1f} req/s  p50={result['p50_ms']}ms  p95={result['p95_ms']}ms  "
+            f"p99={result['p99_ms']}ms  errors={result['errors']}  4xx={result['status_4xx']}  "
+            f"workers={result['workers']} x {result['worker_rss_mb']}MB (total {result['total_rss_mb']}MB)"
+        )
+        self.stdout.write(f"{'':12} p95 by kind: {result['by_kind_p95_ms']}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.services.static_images import optimize_images
+
+
+class Command(BaseCommand):
+    help = "AVIF/WebP варианты изображений core/static/images для {% picture %} (до collectstatic)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Перекодировать все изображения")
+
+    def handle(self, *args, **options):
+        encoded, skipped = optimize_images(force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f"Encoded: {encoded}, unchanged: {skipped}"))
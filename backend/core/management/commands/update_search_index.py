@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Car
+from core.services.search import update_search_vectors
+
+
+class Command(BaseCommand):
+    help = "Пересчёт Car.search_vector для полнотекстового поиска (PostgreSQL)"
+
+    def handle(self, *args, **options):
+        count = update_search_vectors(Car.objects.all())
+        self.stdout.write(f"Search vectors updated: {count}")
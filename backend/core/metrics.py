@@ -0,0 +1,207 @@
+import atexit
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+
+from django.conf import settings
+
+# Процесс держит свои значения в памяти и сбрасывает их в свой файл
+# {pid}-{start}.json в METRICS_DIR не чаще раза в FLUSH_INTERVAL.
+# /metrics в любом воркере складывает файлы всех процессов — включая
+# завершившиеся, поэтому счётчики не уменьшаются при перезапуске воркеров.
+FLUSH_INTERVAL = 1.0
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+_registry = []
+_lock = threading.Lock()
+_values = {}  # имя метрики -> {строка меток: значение или [бакеты..., sum, count]}
+_state = {'pid': None, 'path': None, 'flushed': 0.0, 'timer': None}
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values):
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+def _join(*parts):
+    parts = [part for part in parts if part]
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _registry.append(self)
+
+    def _series(self):
+        _check_pid()
+        return _values.setdefault(self.name, {})
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, *labelvalues, amount=1):
+        key = _labels(self.labelnames, labelvalues)
+        with _lock:
+            series = self._series()
+            series[key] = series.get(key, 0) + amount
+        _schedule_flush()
+
+    def expose(self, series):
+        for key, value in sorted(series.items()):
+            yield f'{self.name}{_join(key)} {value}'
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, *labelvalues):
+        key = _labels(self.labelnames, labelvalues)
+        with _lock:
+            series = self._series()
+            # [по бакетам (не накопительно)..., +Inf, sum, count]
+            counts = series.get(key)
+            if counts is None:
+                counts = series[key] = [0] * (len(self.buckets) + 3)
+            counts[bisect_left(self.buckets, value)] += 1
+            counts[-2] += value
+            counts[-1] += 1
+        _schedule_flush()
+
+    def expose(self, series):
+        for key, counts in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, '+Inf'), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f'{self.name}_bucket{_join(key, le)} {cumulative}'
+            yield f'{self.name}_sum{_join(key)} {counts[-2]}'
+            yield f'{self.name}_count{_join(key)} {counts[-1]}'
+
+
+# === МЕТРИКИ ===
+
+REQUEST_SECONDS = Histogram('http_request_duration_seconds', "Request latency by view", ['view', 'method'])
+REQUESTS = Counter('http_requests_total', "Responses by view and status code", ['view', 'method', 'status'])
+REQUEST_QUERIES = Histogram(
+    'http_request_db_queries', "SQL queries per request by view", ['view'], buckets=QUERY_BUCKETS,
+)
+CACHE_REQUESTS = Counter('cache_requests_total', "Cache lookups by layer", ['layer', 'result'])
+TELEGRAM_SECONDS = Histogram('telegram_delivery_duration_seconds', "Telegram sendMessage latency", ['result'])
+TELEGRAM_FAILURES = Counter('telegram_delivery_failures_total', "Failed Telegram deliveries", ['reason'])
+DNS_SECONDS = Histogram('email_dns_lookup_duration_seconds', "Email domain DNS validation latency", ['result'])
+
+
+# === ХРАНЕНИЕ ===
+
+def _directory():
+    return settings.METRICS_DIR
+
+
+def _check_pid():
+    # После fork (gunicorn --preload) значения родителя не наши — иначе посчитаются дважды
+    pid = os.getpid()
+    if _state['pid'] != pid:
+        _values.clear()
+        _state.update(pid=pid, path=None, flushed=0.0, timer=None)
+
+
+def _schedule_flush():
+    if not _directory():
+        return
+    with _lock:
+        if _state['timer'] is not None:
+            return
+        delay = max(_state['flushed'] + FLUSH_INTERVAL - time.monotonic(), 0)
+        timer = _state['timer'] = threading.Timer(delay, flush)
+        timer.daemon = True
+    timer.start()
+
+
+def flush():
+    """Атомарно записывает значения процесса в его файл"""
+    directory = _directory()
+    if not directory:
+        return
+    with _lock:
+        _check_pid()
+        _state['timer'] = None
+        _state['flushed'] = time.monotonic()
+        if _state['path'] is None:
+            Path(directory).mkdir(parents=True, exist_ok=True)
+            _state['path'] = Path(directory) / f'{os.getpid()}-{int(time.time() * 1000)}.json'
+        tmp = _state['path'].with_suffix('.tmp')
+        tmp.write_text(json.dumps(_values))
+        os.replace(tmp, _state['path'])
+
+
+atexit.register(flush)
+
+
+def _merge(total, values):
+    for name, series in values.items():
+        merged = total.setdefault(name, {})
+        for key, value in series.items():
+            if isinstance(value, list):
+                current = merged.get(key)
+                merged[key] = value[:] if current is None else [a + b for a, b in zip(current, value)]
+            else:
+                merged[key] = merged.get(key, 0) + value
+
+
+def collect():
+    """Значения всех процессов: файлы METRICS_DIR или память этого процесса"""
+    directory = _directory()
+    if not directory:
+        with _lock:
+            _check_pid()
+            return json.loads(json.dumps(_values))
+
+    flush()
+    total = {}
+    for path in Path(directory).glob('*.json'):
+        try:
+            _merge(total, json.loads(path.read_text()))
+        except (OSError, ValueError):
+            # Файл удалён или пишется прямо сейчас (os.replace атомарен, но glob — нет)
+            continue
+    return total
+
+
+def render():
+    """Текстовый формат Prometheus (exposition format 0.0.4)"""
+    values = collect()
+    lines = []
+    for metric in _registry:
+        lines.append(f'# HELP {metric.name} {metric.documentation}')
+        lines.append(f'# TYPE {metric.name} {metric.kind}')
+        lines.extend(metric.expose(values.get(metric.name, {})))
+
+    # Доля попаданий считается из суммарных счётчиков всех процессов
+    lookups = {}
+    for key, value in values.get(CACHE_REQUESTS.name, {}).items():
+        layer, result = key.split(',result=')
+        hits, total = lookups.get(layer, (0, 0))
+        lookups[layer] = (hits + (value if result == '"hit"' else 0), total + value)
+    lines.append('# HELP cache_hit_ratio Cache hit ratio by layer since the metrics directory was created')
+    lines.append('# TYPE cache_hit_ratio gauge')
+    for layer, (hits, total) in sorted(lookups.items()):
+        lines.append(f'cache_hit_ratio{{{layer}}} {hits / total if total else 0}')
+    return '\n'.join(lines) + '\n'
@@ -1,6 +1,17 @@
+import logging
+import random
+import time
+from contextlib import ExitStack
+
 from django.conf import settings
+from django.db import connections
 from django.utils import translation
 
+from . import metrics, timing
+from .cache import get_language_bucket
+
+logger = logging.getLogger('core.timing')
+
 
 class StrictLanguageMiddleware:
     def __init__(self, get_response):
@@ -10,17 +21,91 @@ class StrictLanguageMiddleware:
         # Получаем язык из заголовка запроса, куки или URL (например, /fr/)
         lang = translation.get_language_from_request(request)
 
-        # Берём список поддерживаемых языков из настроек
-        supported = dict(settings.LANGUAGES)
-
-        if lang not in supported:
-            # Если язык не поддерживается — насильно включаем язык по умолчанию
-            translation.activate(settings.LANGUAGE_CODE)
-            request.LANGUAGE_CODE = settings.LANGUAGE_CODE
-        else:
-            # Если поддерживается — активируем этот язык
-            translation.activate(lang)
-            request.LANGUAGE_CODE = lang
+        # Сводим к языку из settings.LANGUAGES (неподдерживаемый -> язык по умолчанию),
+        # по тому же правилу строятся ключи кэша страниц
+        lang = get_language_bucket(lang)
+        translation.activate(lang)
+        request.LANGUAGE_CODE = lang
 
         # Продолжаем выполнение запроса
         return self.get_response(request)
+
+
+class ServerTimingMiddleware:
+    """Server-Timing и JSON-строка в лог: SQL, context processors, шаблоны, кэш, DNS.
+
+    Замеряется доля запросов SERVER_TIMING_SAMPLE_RATE; вне выборки
+    инструментирование сводится к одной проверке ContextVar. Заголовок —
+    только staff или всем при SERVER_TIMING_HEADER.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.SERVER_TIMING_SAMPLE_RATE
+        self.public_header = settings.SERVER_TIMING_HEADER
+
+    def __call__(self, request):
+        if self.sample_rate <= 0 or random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        timings, token = timing.activate()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(timing.db_wrapper))
+                response = self.get_response(request)
+        finally:
+            timing.deactivate(token)
+
+        total = timings.total()
+        # request.user проставлен AuthenticationMiddleware внутри get_response
+        user = getattr(request, 'user', None)
+        if self.public_header or (user is not None and user.is_staff):
+            response['Server-Timing'] = timings.header(total)
+        match = request.resolver_match
+        logger.info(timings.log_line(
+            method=request.method,
+            path=request.path,
+            view=match.view_name if match else None,
+            status=response.status_code,
+        ))
+        return response
+
+    def process_template_response(self, request, response):
+        # Вызывается прямо перед response.render(): конец рендеринга — в post-render callback
+        timings = timing.current()
+        if timings is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda response: timings.add('tpl', time.perf_counter() - started)
+            )
+        return response
+
+
+class MetricsMiddleware:
+    """Метрики Prometheus по каждому запросу: латентность, статус, число SQL-запросов по view"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0]
+
+        def count(execute, sql, params, many, context):
+            queries[0] += 1
+            return execute(sql, params, many, context)
+
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(count))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+
+        # Только имена маршрутов: путь с slug машины раздул бы число серий
+        match = request.resolver_match
+        view = match.view_name if match else 'unresolved'
+        metrics.REQUEST_SECONDS.observe(elapsed, view, request.method)
+        metrics.REQUESTS.inc(view, request.method, response.status_code)
+        metrics.REQUEST_QUERIES.observe(queries[0], view)
+        return response
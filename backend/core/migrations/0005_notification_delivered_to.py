@@ -0,0 +1,20 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0004_notification"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="notification",
+            name="delivered_to",
+            field=models.CharField(
+                blank=True, help_text="Comma separated chat IDs", max_length=500
+            ),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_notification_delivered_to"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CarImage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "field",
+                    models.CharField(
+                        choices=[
+                            ("main_image", "Main image"),
+                            ("image_2", "Image 2"),
+                            ("image_3", "Image 3"),
+                            ("image_4", "Image 4"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("source_url", models.URLField(max_length=500)),
+                (
+                    "file",
+                    models.ImageField(
+                        height_field="height", upload_to="cars/", width_field="width"
+                    ),
+                ),
+                ("width", models.PositiveIntegerField(blank=True, null=True)),
+                ("height", models.PositiveIntegerField(blank=True, null=True)),
+                ("variants", models.JSONField(blank=True, default=list)),
+                ("fetched_at", models.DateTimeField(auto_now=True)),
+                (
+                    "car",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="local_images",
+                        to="core.car",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Car Image",
+                "verbose_name_plural": "Car Images",
+                "ordering": ["car", "field"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="carimage",
+            constraint=models.UniqueConstraint(
+                fields=("car", "field"), name="unique_car_image_field"
+            ),
+        ),
+    ]
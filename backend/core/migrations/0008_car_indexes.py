@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0007_car_updated_at_carcategory_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                fields=["is_active", "order", "name"], name="car_active_order_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="car",
+            index=models.Index(
+                fields=["category", "slug"], name="car_category_slug_idx"
+            ),
+        ),
+    ]
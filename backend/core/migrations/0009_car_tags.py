@@ -0,0 +1,128 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:56
+
+import django.db.models.deletion
+import taggit.managers
+from django.db import migrations, models
+from django.utils.text import slugify
+
+
+def _unique_slug(Tag, name):
+    base = slugify(name, allow_unicode=True) or "tag"
+    slug, n = base, 1
+    while Tag.objects.filter(slug=slug).exists():
+        n += 1
+        slug = f"{base}_{n}"
+    return slug
+
+
+def tags_to_relation(apps, schema_editor):
+    """Строки "Exclusive, Hybrid" -> Tag + TaggedCar (регистр как у TAGGIT_CASE_INSENSITIVE)"""
+    Car = apps.get_model("core", "Car")
+    Tag = apps.get_model("taggit", "Tag")
+    TaggedCar = apps.get_model("core", "TaggedCar")
+
+    tags = {}
+    links = []
+    for car in Car.objects.exclude(tags_text="").only("pk", "tags_text"):
+        names = {}
+        for name in car.tags_text.split(","):
+            name = name.strip()
+            if name:
+                names.setdefault(name.lower(), name)
+
+        for key, name in names.items():
+            tag = tags.get(key)
+            if tag is None:
+                tag = Tag.objects.filter(name__iexact=name).first()
+                if tag is None:
+                    tag = Tag.objects.create(name=name, slug=_unique_slug(Tag, name))
+                tags[key] = tag
+            links.append(TaggedCar(content_object_id=car.pk, tag_id=tag.pk))
+
+    TaggedCar.objects.bulk_create(links, batch_size=500)
+
+
+def relation_to_tags(apps, schema_editor):
+    Car = apps.get_model("core", "Car")
+    TaggedCar = apps.get_model("core", "TaggedCar")
+
+    names = {}
+    for car_id, name in TaggedCar.objects.order_by("tag__name").values_list(
+        "content_object_id", "tag__name"
+    ):
+        names.setdefault(car_id, []).append(name)
+    for car_id, car_tags in names.items():
+        Car.objects.filter(pk=car_id).update(tags_text=", ".join(car_tags)[:500])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "taggit",
+            "0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx",
+        ),
+        ("core", "0008_car_indexes"),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name="car",
+            old_name="tags",
+            new_name="tags_text",
+        ),
+        migrations.CreateModel(
+            name="TaggedCar",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "content_object",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tagged_items",
+                        to="core.car",
+                    ),
+                ),
+                (
+                    "tag",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="%(app_label)s_%(class)s_items",
+                        to="taggit.tag",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="car",
+            name="tags",
+            field=taggit.managers.TaggableManager(
+                blank=True,
+                help_text="Comma separated: Exclusive, Hybrid, Sport",
+                through="core.TaggedCar",
+                to="taggit.Tag",
+                verbose_name="Tags",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="taggedcar",
+            index=models.Index(
+                fields=["tag", "content_object"], name="tagged_car_tag_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="taggedcar",
+            constraint=models.UniqueConstraint(
+                fields=("content_object", "tag"), name="unique_car_tag"
+            ),
+        ),
+        migrations.RunPython(tags_to_relation, relation_to_tags),
+    ]
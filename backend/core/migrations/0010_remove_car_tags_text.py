@@ -0,0 +1,19 @@
+# Generated by Django 4.2.30 on 2026-10-18 10:56
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Отдельная миграция: в PostgreSQL ALTER TABLE после вставки строк с FK
+    # в той же транзакции падает с "pending trigger events"
+
+    dependencies = [
+        ("core", "0009_car_tags"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="car",
+            name="tags_text",
+        ),
+    ]
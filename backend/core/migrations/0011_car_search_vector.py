@@ -0,0 +1,40 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:20
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    # GIN и pg_trgm только в PostgreSQL; в SQLite поиск идёт по индексу в памяти.
+    # Расширение здесь, а не TrigramExtension(): её откат вне PostgreSQL
+    # падает на запросе к pg_extension
+    if schema_editor.connection.vendor == "postgresql":
+        # Для TrigramWordSimilarity (опечатки в названиях)
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "CREATE INDEX car_search_vector_idx ON core_car USING gin (search_vector)"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS car_search_vector_idx")
+        schema_editor.execute("DROP EXTENSION IF EXISTS pg_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0010_remove_car_tags_text"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="car",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def add_period_exclusion(apps, schema_editor):
+    # daterange-колонка вычисляется самой БД, а GiST exclusion не даёт
+    # двум броням одной машины пересечься даже при гонке запросов
+    if schema_editor.connection.vendor == "postgresql":
+        # car_id WITH = в GiST-индексе; не BtreeGistExtension() — её откат
+        # вне PostgreSQL падает на запросе к pg_extension
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+        schema_editor.execute(
+            "ALTER TABLE core_reservation ADD COLUMN period daterange "
+            "GENERATED ALWAYS AS (daterange(start_date, end_date, '[)')) STORED"
+        )
+        schema_editor.execute(
+            "ALTER TABLE core_reservation ADD CONSTRAINT reservation_no_overlap "
+            "EXCLUDE USING gist (car_id WITH =, period WITH &&)"
+        )
+
+
+def drop_period_exclusion(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(
+            "ALTER TABLE core_reservation DROP CONSTRAINT IF EXISTS reservation_no_overlap"
+        )
+        schema_editor.execute("ALTER TABLE core_reservation DROP COLUMN IF EXISTS period")
+        schema_editor.execute("DROP EXTENSION IF EXISTS btree_gist")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0011_car_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Reservation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField()),
+                ("customer", models.CharField(blank=True, max_length=200)),
+                ("note", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "car",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="reservations",
+                        to="core.car",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Reservation",
+                "verbose_name_plural": "Reservations",
+                "ordering": ["start_date", "car"],
+                "indexes": [
+                    models.Index(
+                        fields=["car", "start_date"], name="reservation_car_start_idx"
+                    ),
+                    models.Index(fields=["end_date"], name="reservation_end_idx"),
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="reservation",
+            constraint=models.CheckConstraint(
+                check=models.Q(("end_date__gt", models.F("start_date"))),
+                name="reservation_dates_order",
+            ),
+        ),
+        migrations.RunPython(add_period_exclusion, drop_period_exclusion),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 4.2.30 on 2026-10-18 11:02
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0012_reservation"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LengthDiscount",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("min_days", models.PositiveIntegerField(unique=True)),
+                ("percent", models.DecimalField(decimal_places=2, max_digits=4)),
+            ],
+            options={
+                "verbose_name": "Length discount",
+                "verbose_name_plural": "Length discounts",
+                "ordering": ["min_days"],
+            },
+        ),
+        migrations.CreateModel(
+            name="SeasonalRate",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100)),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField()),
+                (
+                    "multiplier",
+                    models.DecimalField(
+                        decimal_places=2, help_text="1.25 = +25%", max_digits=4
+                    ),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Empty — all categories",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="seasonal_rates",
+                        to="core.carcategory",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Seasonal rate",
+                "verbose_name_plural": "Seasonal rates",
+                "ordering": ["start_date"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="seasonalrate",
+            constraint=models.CheckConstraint(
+                check=models.Q(("end_date__gt", models.F("start_date"))),
+                name="seasonal_rate_dates_order",
+            ),
+        ),
+    ]
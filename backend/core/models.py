@@ -1,11 +1,17 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.db import models
+from django.utils import timezone
 from django.utils.text import slugify
+from taggit.managers import TaggableManager
+from taggit.models import TaggedItemBase
 
 
 class CarCategory(models.Model):
     name = models.CharField(max_length=100)
     slug = models.SlugField(unique=True)
+    updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
         verbose_name = "Car Category"
@@ -37,15 +43,24 @@ class Car(models.Model):
     seats = models.PositiveIntegerField(default=2)
     transmission = models.CharField(max_length=50, default='Automatic')
     
-    # Tags (comma separated)
-    tags = models.CharField(max_length=500, blank=True, help_text="Comma separated: Exclusive, Hybrid, Sport")
+    # Tags
+    tags = TaggableManager(blank=True, through='TaggedCar', help_text="Comma separated: Exclusive, Hybrid, Sport")
     
     is_active = models.BooleanField(default=True)
     order = models.PositiveIntegerField(default=0, verbose_name="Порядок")
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # Полнотекстовый поиск (PostgreSQL): обновляется services.search.update_search_vectors
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         ordering = ['order', 'name']
+        indexes = [
+            # Выборка активных машин в порядке вывода и keyset-пагинация /api/cars/
+            models.Index(fields=['is_active', 'order', 'name'], name='car_active_order_idx'),
+            models.Index(fields=['category', 'slug'], name='car_category_slug_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -59,9 +74,13 @@ class Car(models.Model):
         return f"/{self.category.slug}/{self.slug}/"
     
     def get_tags_list(self):
-        if self.tags:
-            return [tag.strip() for tag in self.tags.split(',')]
-        return []
+        # Порядок добавления (pk связи), как его задал менеджер, а не алфавит.
+        # С prefetch_related('tagged_items__tag') — без запросов, иначе один запрос
+        if 'tagged_items' in getattr(self, '_prefetched_objects_cache', {}):
+            items = sorted(self.tagged_items.all(), key=lambda item: item.pk)
+        else:
+            items = self.tagged_items.select_related('tag').order_by('pk')
+        return [item.tag.name for item in items]
     
     def get_images(self):
         images = [self.main_image]
@@ -71,6 +90,135 @@ class Car(models.Model):
         return images
     
 
+class TaggedCar(TaggedItemBase):
+    """Связь машина–тег с настоящим FK вместо generic relation taggit"""
+    content_object = models.ForeignKey(Car, on_delete=models.CASCADE, related_name='tagged_items')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content_object', 'tag'], name='unique_car_tag'),
+        ]
+        indexes = [
+            # Посадочные страницы тегов: tag -> машины одним индексным join
+            models.Index(fields=['tag', 'content_object'], name='tagged_car_tag_idx'),
+        ]
+
+
+class CarImage(models.Model):
+    """Локальная копия фото машины (main_image, image_2..4) с WebP-вариантами по ширине"""
+
+    class Field(models.TextChoices):
+        MAIN_IMAGE = 'main_image', 'Main image'
+        IMAGE_2 = 'image_2', 'Image 2'
+        IMAGE_3 = 'image_3', 'Image 3'
+        IMAGE_4 = 'image_4', 'Image 4'
+
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name='local_images')
+    field = models.CharField(max_length=20, choices=Field.choices)
+    source_url = models.URLField(max_length=500)
+    file = models.ImageField(upload_to='cars/', width_field='width', height_field='height')
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    # [[width, url], ...] по возрастанию ширины — готовый srcset без запросов
+    variants = models.JSONField(default=list, blank=True)
+    fetched_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['car', 'field']
+        verbose_name = "Car Image"
+        verbose_name_plural = "Car Images"
+        constraints = [
+            models.UniqueConstraint(fields=['car', 'field'], name='unique_car_image_field'),
+        ]
+
+    def __str__(self):
+        return f"{self.car} — {self.get_field_display()}"
+
+
+class Reservation(models.Model):
+    """Бронь машины на дни [start_date, end_date): end_date — день возврата, он свободен.
+
+    В PostgreSQL пересечения запрещены exclusion-ограничением по daterange
+    (миграция 0012), в остальных БД — проверкой в clean().
+    """
+
+    car = models.ForeignKey(Car, on_delete=models.CASCADE, related_name='reservations')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    customer = models.CharField(max_length=200, blank=True)
+    note = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['start_date', 'car']
+        verbose_name = "Reservation"
+        verbose_name_plural = "Reservations"
+        constraints = [
+            models.CheckConstraint(check=models.Q(end_date__gt=models.F('start_date')), name='reservation_dates_order'),
+        ]
+        indexes = [
+            models.Index(fields=['car', 'start_date'], name='reservation_car_start_idx'),
+            # Текущие и будущие брони: end_date > сегодня
+            models.Index(fields=['end_date'], name='reservation_end_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.car} {self.start_date:%d.%m}–{self.end_date:%d.%m.%Y}"
+
+    def clean(self):
+        if self.start_date and self.end_date and self.end_date <= self.start_date:
+            raise ValidationError({'end_date': "End date must be after start date"})
+        if self.car_id and self.start_date and self.end_date:
+            overlapping = Reservation.objects.filter(
+                car_id=self.car_id, start_date__lt=self.end_date, end_date__gt=self.start_date,
+            ).exclude(pk=self.pk)
+            if overlapping.exists():
+                raise ValidationError("The car is already reserved for these dates")
+
+
+class SeasonalRate(models.Model):
+    """Сезонный коэффициент к price_per_day на дни [start_date, end_date).
+
+    Тариф категории важнее общего; из пересекающихся тарифов одного уровня
+    действует наибольший коэффициент.
+    """
+
+    name = models.CharField(max_length=100)
+    category = models.ForeignKey(
+        CarCategory, on_delete=models.CASCADE, null=True, blank=True, related_name='seasonal_rates',
+        help_text="Empty — all categories",
+    )
+    start_date = models.DateField()
+    end_date = models.DateField()
+    multiplier = models.DecimalField(max_digits=4, decimal_places=2, help_text="1.25 = +25%")
+
+    class Meta:
+        ordering = ['start_date']
+        verbose_name = "Seasonal rate"
+        verbose_name_plural = "Seasonal rates"
+        constraints = [
+            models.CheckConstraint(check=models.Q(end_date__gt=models.F('start_date')), name='seasonal_rate_dates_order'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ×{self.multiplier}"
+
+
+class LengthDiscount(models.Model):
+    """Скидка за длительность аренды: от min_days дней"""
+
+    min_days = models.PositiveIntegerField(unique=True)
+    percent = models.DecimalField(max_digits=4, decimal_places=2)
+
+    class Meta:
+        ordering = ['min_days']
+        verbose_name = "Length discount"
+        verbose_name_plural = "Length discounts"
+
+    def __str__(self):
+        return f"{self.min_days}+ days: −{self.percent}%"
+
+
 class CodeSnippet(models.Model):
     """Система code snippets как WPCode для header/footer скриптов"""
     
@@ -134,3 +282,38 @@ class CodeSnippet(models.Model):
                     return True
         
         return False
+
+
+class Notification(models.Model):
+    """Outbox заявок: view только сохраняет строку, доставку в Telegram делает воркер"""
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        SENT = 'sent', 'Sent'
+        DEAD = 'dead', 'Dead (delivery failed)'
+
+    source = models.CharField(max_length=50, help_text="booking, contact, car_request")
+    message = models.TextField()
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    delivered_to = models.CharField(max_length=500, blank=True, help_text="Comma separated chat IDs")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = "Notification"
+        verbose_name_plural = "Notifications"
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='notification_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.source} #{self.pk} ({self.get_status_display()})"
+
+    def get_delivered_list(self):
+        if self.delivered_to:
+            return [cid.strip() for cid in self.delivered_to.split(',')]
+        return []
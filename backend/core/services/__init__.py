@@ -1 +1,9 @@
+from .availability import BOOKINGS_HORIZON, busy_car_ids, car_bookings
+from .car_cards import get_car_card, get_car_cards, get_car_cards_by_ids
+from .email_domains import INVALID, UNKNOWN, VALID, check_email_domain
+from .fleet import FleetQueryError, parse_date, query_fleet, query_tag, reorder_cars
+from .notifications import enqueue_notification
+from .quotes import get_rate_card, quote_fleet
+from .search import search_car_ids, search_cars
+from .snippets import get_snippet_index
 from .telegram import send_telegram
\ No newline at end of file
@@ -0,0 +1,105 @@
+from django.db import connection
+from django.db.models import BooleanField
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+from ..cache import RESERVATIONS, get_version
+from ..models import Reservation
+
+# На сколько дней вперёд показываем занятость на странице машины
+BOOKINGS_HORIZON = 60
+
+# Последнее дерево процесса: ((version, today), tree)
+_local_tree = (None, None)
+
+
+class IntervalTree:
+    """Статическое дерево интервалов [start, end) с максимумом end в поддереве.
+
+    Интервалы отсортированы по start и лежат в массиве как в сбалансированном
+    дереве поиска (корень — середина отрезка); поиск пересечений — O(log n + k).
+    """
+
+    def __init__(self, intervals):
+        # intervals: [(start, end, value), ...]
+        self.items = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self.max_end = [None] * len(self.items)
+        if self.items:
+            self._build(0, len(self.items))
+
+    def _build(self, lo, hi):
+        mid = (lo + hi) // 2
+        max_end = self.items[mid][1]
+        if lo < mid:
+            max_end = max(max_end, self._build(lo, mid))
+        if mid + 1 < hi:
+            max_end = max(max_end, self._build(mid + 1, hi))
+        self.max_end[mid] = max_end
+        return max_end
+
+    def overlapping(self, start, end):
+        """Значения интервалов, пересекающих [start, end)"""
+        found = []
+        stack = [(0, len(self.items))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            # В поддереве ничего не заканчивается после start — пропускаем целиком
+            if self.max_end[mid] <= start:
+                continue
+            item_start, item_end, value = self.items[mid]
+            if item_start < end and item_end > start:
+                found.append(value)
+            stack.append((lo, mid))
+            # Правее только интервалы, начинающиеся не раньше item_start
+            if item_start < end:
+                stack.append((mid + 1, hi))
+        return found
+
+
+def get_reservation_tree():
+    """Дерево текущих и будущих броней, пересобирается при смене RESERVATIONS"""
+    global _local_tree
+
+    today = timezone.localdate()
+    key = (get_version(RESERVATIONS), today)
+    if _local_tree[0] != key:
+        rows = Reservation.objects.filter(end_date__gt=today).values_list('start_date', 'end_date', 'car_id')
+        _local_tree = (key, IntervalTree(rows))
+    return _local_tree[1]
+
+
+def _overlap(start, end):
+    # Использует GiST-индекс exclusion-ограничения reservation_no_overlap
+    return RawSQL("core_reservation.period && daterange(%s, %s, '[)')", (start, end), output_field=BooleanField())
+
+
+def busy_car_ids(start, end):
+    """pk машин, занятых хотя бы один день в [start, end) — один запрос на весь автопарк"""
+    if end <= start:
+        return set()
+    if connection.vendor == 'postgresql':
+        return set(Reservation.objects.filter(_overlap(start, end)).values_list('car_id', flat=True))
+    if start < timezone.localdate():
+        # В дереве только текущие и будущие брони
+        return set(
+            Reservation.objects.filter(start_date__lt=end, end_date__gt=start).values_list('car_id', flat=True)
+        )
+    return set(get_reservation_tree().overlapping(start, end))
+
+
+def car_bookings(car_id, start, end):
+    """Занятые периоды машины в [start, end): [(start, end), ...], соседние склеены"""
+    rows = Reservation.objects.filter(
+        car_id=car_id, start_date__lt=end, end_date__gt=start,
+    ).order_by('start_date').values_list('start_date', 'end_date')
+
+    merged = []
+    for row_start, row_end in rows:
+        if merged and row_start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], row_end))
+        else:
+            merged.append((row_start, row_end))
+    return merged
@@ -0,0 +1,179 @@
+import heapq
+from collections import namedtuple
+
+from django.core.cache import cache
+
+from ..cache import FLEET, get_version
+from ..models import Car
+from ..timing import record_cache
+
+CARDS_TIMEOUT = 60 * 60 * 24
+# Увеличить при изменении CarCard.__slots__ или их содержимого: строки в кэше позиционные
+CARDS_FORMAT = 4
+
+IMAGE_FIELDS = ('main_image', 'image_2', 'image_3', 'image_4')
+
+SIMILAR_COUNT = 3
+SIMILAR_WINDOW = 20  # соседей по цене, из которых выбираются похожие
+
+# Фото для шаблона: полный URL, src, srcset по WebP-вариантам и размеры
+CardImage = namedtuple('CardImage', ['url', 'src', 'srcset', 'width', 'height'])
+
+# Последние карточки процесса: (version, cards, cards_by_slug, cards_by_id)
+_local_cards = (None, (), {}, {})
+
+
+def build_card_image(car, field):
+    """CardImage для фото машины: локальная копия с вариантами или исходный URL"""
+    # local_images берётся из prefetch_related — без запросов на каждое фото
+    for image in car.local_images.all():
+        if image.field == field and image.file:
+            srcset = ', '.join(f'{url} {width}w' for width, url in image.variants)
+            # src для клиентов без srcset (и краулеров) — средний вариант, не оригинал
+            src = next((url for width, url in image.variants if width >= 640), image.file.url)
+            return CardImage(image.file.url, src, srcset, image.width, image.height)
+
+    url = getattr(car, field)
+    return CardImage(url, url, '', None, None) if url else None
+
+
+class CarCard:
+    """Готовая к выводу машина: без ORM, всё уже посчитано при сборке.
+
+    Атрибуты повторяют Car там, где их читают шаблоны (name, seats, image_2...),
+    поэтому теги car_image/car_image_url принимают и Car, и CarCard.
+    """
+
+    __slots__ = (
+        'id', 'slug', 'name', 'url', 'category_name', 'category_slug',
+        'description', 'price_per_day', 'price_display', 'seats', 'transmission',
+        'tags', 'main_image', 'image_2', 'image_3', 'image_4', 'lastmod', 'category_id', 'similar',
+    )
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    @classmethod
+    def from_car(cls, car):
+        return cls(
+            car.pk,
+            car.slug,
+            car.name,
+            car.get_absolute_url(),
+            car.category.name,
+            car.category.slug,
+            car.description,
+            car.price_per_day,
+            f'{car.price_per_day:.0f}',
+            car.seats,
+            car.transmission,
+            tuple(car.get_tags_list()),
+            *(build_card_image(car, field) for field in IMAGE_FIELDS),
+            max(car.updated_at, car.category.updated_at),
+            car.category_id,
+            (),
+        )
+
+    def as_tuple(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f'<CarCard {self.slug}>'
+
+    def get_absolute_url(self):
+        return self.url
+
+    def get_tags_list(self):
+        return self.tags
+
+    def get_images(self):
+        return [image.url for image in (self.main_image, self.image_2, self.image_3, self.image_4) if image]
+
+
+def _cards_key(version):
+    return f'core:cars:{CARDS_FORMAT}:{version}'
+
+
+def _fill_similar(cards):
+    """Похожие машины: категория, общие теги, близкая цена.
+
+    Кандидаты — соседи по цене внутри категории и во всём автопарке,
+    поэтому сборка O(n · SIMILAR_WINDOW), а не O(n²).
+    """
+    by_price = sorted(cards, key=lambda card: card.price_per_day)
+    groups = {}
+    for card in by_price:
+        groups.setdefault(card.category_id, []).append(card)
+    positions = {card.id: i for i, card in enumerate(by_price)}
+    group_positions = {card.id: i for group in groups.values() for i, card in enumerate(group)}
+    prices = {card.id: float(card.price_per_day) for card in cards}
+    tags = {card.id: set(card.tags) for card in cards}
+
+    def neighbours(ordered, position):
+        return ordered[max(position - SIMILAR_WINDOW, 0):position + SIMILAR_WINDOW + 1]
+
+    for card in cards:
+        price, card_tags = prices[card.id], tags[card.id]
+        scored = {}
+        for other in neighbours(by_price, positions[card.id]) + neighbours(groups[card.category_id], group_positions[card.id]):
+            if other.id == card.id or other.id in scored:
+                continue
+            other_price, other_tags = prices[other.id], tags[other.id]
+            score = 3.0 if other.category_id == card.category_id else 0.0
+            if card_tags or other_tags:
+                score += 2.0 * len(card_tags & other_tags) / len(card_tags | other_tags)
+            high = max(price, other_price)
+            if high:
+                score += 1 - abs(price - other_price) / high
+            scored[other.id] = (-score, other_price, other.id)
+        card.similar = tuple(key[2] for key in heapq.nsmallest(SIMILAR_COUNT, scored.values()))
+
+
+def _build_rows():
+    cars = (
+        Car.objects.filter(is_active=True)
+        .select_related('category')
+        .prefetch_related('local_images', 'tagged_items__tag')
+    )
+    cards = [CarCard.from_car(car) for car in cars]
+    # Похожие считаются при сборке (после сохранения машины), не на запрос
+    _fill_similar(cards)
+    return tuple(card.as_tuple() for card in cards)
+
+
+def _load():
+    global _local_cards
+
+    version = get_version(FLEET)
+    if _local_cards[0] == version:
+        return _local_cards
+
+    # В общем кэше — компактные кортежи, объекты собираются один раз на процесс
+    rows = cache.get(_cards_key(version))
+    record_cache('cards', rows is not None)
+    if rows is None:
+        rows = _build_rows()
+        cache.set(_cards_key(version), rows, CARDS_TIMEOUT)
+
+    cards = tuple(CarCard(*row) for row in rows)
+    by_slug = {(card.category_slug, card.slug): card for card in cards}
+    by_id = {card.id: card for card in cards}
+    _local_cards = (version, cards, by_slug, by_id)
+    return _local_cards
+
+
+def get_car_cards():
+    """Активные машины в порядке вывода (Car.Meta.ordering)"""
+    return _load()[1]
+
+
+def get_car_card(category_slug, car_slug):
+    """Карточка машины по slug категории и машины или None"""
+    return _load()[2].get((category_slug, car_slug))
+
+
+def get_car_cards_by_ids(ids):
+    """Карточки в порядке ids; неактивные и удалённые пропускаются"""
+    by_id = _load()[3]
+    return [by_id[pk] for pk in ids if pk in by_id]
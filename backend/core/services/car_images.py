@@ -0,0 +1,101 @@
+import hashlib
+import io
+import logging
+import os
+from urllib.parse import urlparse
+
+import requests
+from django.core.files.base import ContentFile
+from easy_thumbnails.files import get_thumbnailer
+from PIL import Image
+
+from ..models import CarImage
+
+logger = logging.getLogger(__name__)
+
+VARIANT_WIDTHS = (320, 480, 640, 960, 1280, 1920)
+VARIANT_QUALITY = 80
+DOWNLOAD_TIMEOUT = (5, 30)
+MAX_DOWNLOAD_SIZE = 20 * 1024 * 1024
+
+
+class ImageIngestError(Exception):
+    pass
+
+
+def _download(url):
+    with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        response.raise_for_status()
+        data = io.BytesIO()
+        for chunk in response.iter_content(64 * 1024):
+            data.write(chunk)
+            if data.tell() > MAX_DOWNLOAD_SIZE:
+                raise ImageIngestError(f"{url} is larger than {MAX_DOWNLOAD_SIZE} bytes")
+    content = data.getvalue()
+    try:
+        Image.open(io.BytesIO(content)).verify()
+    except Exception as e:
+        raise ImageIngestError(f"{url} is not a valid image: {e}")
+    return content
+
+
+def _delete_files(image):
+    if image.file:
+        get_thumbnailer(image.file).delete_thumbnails()
+        image.file.delete(save=False)
+
+
+def _build_variants(image):
+    thumbnailer = get_thumbnailer(image.file)
+    thumbnailer.thumbnail_extension = 'webp'
+    variants = []
+    for width in VARIANT_WIDTHS:
+        if width >= image.width:
+            break
+        thumbnail = thumbnailer.get_thumbnail({
+            'size': (width, 0),
+            'quality': VARIANT_QUALITY,
+        })
+        variants.append([width, thumbnail.url])
+    # Оригинал — самый широкий кандидат srcset
+    variants.append([image.width, image.file.url])
+    return variants
+
+
+def ingest_car_images(car, force=False):
+    """Скачивает фото машины в MEDIA_ROOT и строит WebP-варианты.
+
+    Повторно качает только изменившиеся URL; возвращает число загруженных фото.
+    """
+    existing = {image.field: image for image in car.local_images.all()}
+    ingested = 0
+
+    for field in CarImage.Field.values:
+        url = getattr(car, field)
+        image = existing.get(field)
+
+        if not url:
+            if image is not None:
+                _delete_files(image)
+                image.delete()
+            continue
+
+        if image is not None and image.file and image.source_url == url and not force:
+            continue
+
+        content = _download(url)
+        if image is None:
+            image = CarImage(car=car, field=field)
+        else:
+            _delete_files(image)
+
+        ext = os.path.splitext(urlparse(url).path)[1].lower() or '.jpg'
+        digest = hashlib.sha1(content).hexdigest()[:12]
+        image.source_url = url
+        image.file.save(f"{car.slug}/{field}-{digest}{ext}", ContentFile(content), save=False)
+        image.variants = _build_variants(image)
+        image.save()
+        ingested += 1
+        logger.info("Ingested %s for %s", field, car)
+
+    return ingested
@@ -0,0 +1,133 @@
+import logging
+import socket
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from django.core.cache import cache
+
+from .. import metrics
+from ..timing import measure
+
+try:
+    import dns.exception
+    import dns.resolver
+except ImportError:  # dnspython не установлен — проверяем A-записи через getaddrinfo
+    dns = None
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_DEADLINE = 1.5  # секунд на проверку одного домена
+VALID_TTL = 60 * 60 * 24
+INVALID_TTL = 60 * 60  # NXDOMAIN кэшируем короче: домен могут зарегистрировать
+LOCAL_CACHE_SIZE = 1024
+
+# Результат проверки домена
+VALID = 'valid'
+INVALID = 'invalid'
+UNKNOWN = 'unknown'  # таймаут / сбой DNS — не кэшируется
+
+
+class _LocalTTLCache:
+    """LRU с TTL в памяти процесса — популярные домены не доходят даже до Redis"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.data.get(key)
+            if item is None:
+                return None
+            value, expires = item
+            if expires < time.monotonic():
+                del self.data[key]
+                return None
+            self.data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self.lock:
+            self.data[key] = (value, time.monotonic() + ttl)
+            self.data.move_to_end(key)
+            while len(self.data) > self.maxsize:
+                self.data.popitem(last=False)
+
+
+_local_cache = _LocalTTLCache(LOCAL_CACHE_SIZE)
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='dns')
+
+
+def _resolve_mx(domain):
+    resolver = dns.resolver.Resolver()
+    resolver.lifetime = LOOKUP_DEADLINE
+    try:
+        resolver.resolve(domain, 'MX')
+        return VALID
+    except dns.resolver.NXDOMAIN:
+        return INVALID
+    except dns.resolver.NoAnswer:
+        pass
+    except dns.exception.DNSException:
+        return UNKNOWN
+
+    # Нет MX — по RFC 5321 почта идёт на A/AAAA домена
+    for rdtype in ('A', 'AAAA'):
+        try:
+            resolver.resolve(domain, rdtype)
+            return VALID
+        except dns.resolver.NoAnswer:
+            continue
+        except dns.resolver.NXDOMAIN:
+            return INVALID
+        except dns.exception.DNSException:
+            return UNKNOWN
+    return INVALID
+
+
+def _resolve_address(domain):
+    try:
+        socket.getaddrinfo(domain, None)
+        return VALID
+    except socket.gaierror as e:
+        if e.errno in (socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', None)):
+            return INVALID
+        return UNKNOWN
+
+
+def _lookup(domain):
+    resolve = _resolve_mx if dns is not None else _resolve_address
+    # getaddrinfo не умеет таймаут — ограничиваем ожидание снаружи
+    future = _executor.submit(resolve, domain)
+    try:
+        return future.result(timeout=LOOKUP_DEADLINE)
+    except FutureTimeoutError:
+        logger.warning("DNS lookup for %s exceeded %ss", domain, LOOKUP_DEADLINE)
+        return UNKNOWN
+
+
+def check_email_domain(domain):
+    """Проверяет, принимает ли домен почту: VALID, INVALID или UNKNOWN"""
+    domain = domain.strip().lower().rstrip('.')
+    key = f'core:email_domain:{domain}'
+
+    status = _local_cache.get(key)
+    if status is not None:
+        return status
+
+    status = cache.get(key)
+    if status is None:
+        started = time.perf_counter()
+        with measure('dns'):
+            status = _lookup(domain)
+        metrics.DNS_SECONDS.observe(time.perf_counter() - started, status)
+        if status == UNKNOWN:
+            return status
+        cache.set(key, status, VALID_TTL if status == VALID else INVALID_TTL)
+
+    _local_cache.set(key, status, VALID_TTL if status == VALID else INVALID_TTL)
+    return status
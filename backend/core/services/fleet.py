@@ -0,0 +1,189 @@
+import base64
+import datetime
+import json
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils.text import slugify
+
+from ..cache import CATALOG, FLEET, bump_version
+from ..models import Car
+from .availability import busy_car_ids
+
+DEFAULT_LIMIT = 24
+MAX_LIMIT = 100
+# Шаг перенумерации order в reorder_cars: между соседями остаётся место для новой машины
+ORDER_STEP = 10
+
+
+class FleetQueryError(ValueError):
+    """Некорректный параметр фильтра или курсора"""
+
+
+def encode_cursor(order, name, pk):
+    payload = json.dumps([order, name, pk], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        payload = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        order, name, pk = json.loads(payload)
+        return int(order), str(name), int(pk)
+    except (ValueError, TypeError):
+        raise FleetQueryError("Invalid cursor")
+
+
+def _decimal(params, name):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return Decimal(value)
+    except InvalidOperation:
+        raise FleetQueryError(f"Invalid {name}")
+
+
+def _integer(params, name, default=None):
+    value = params.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise FleetQueryError(f"Invalid {name}")
+
+
+def parse_date(params, name):
+    """Дата YYYY-MM-DD из параметра запроса или None"""
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return datetime.date.fromisoformat(value)
+    except ValueError:
+        raise FleetQueryError(f"Invalid {name}")
+
+
+def _filters(params):
+    query = Q(is_active=True)
+    if params.get('category'):
+        query &= Q(category__slug=params['category'])
+
+    price_min = _decimal(params, 'price_min')
+    if price_min is not None:
+        query &= Q(price_per_day__gte=price_min)
+    price_max = _decimal(params, 'price_max')
+    if price_max is not None:
+        query &= Q(price_per_day__lte=price_max)
+
+    seats = _integer(params, 'seats')
+    if seats is not None:
+        query &= Q(seats__gte=seats)
+
+    if params.get('transmission'):
+        query &= Q(transmission__iexact=params['transmission'])
+
+    # available_from/available_to — свободна во все дни [from, to)
+    available_from, available_to = parse_date(params, 'available_from'), parse_date(params, 'available_to')
+    if available_from or available_to:
+        if not (available_from and available_to) or available_to <= available_from:
+            raise FleetQueryError("available_from and available_to must form a date range")
+        busy = busy_car_ids(available_from, available_to)
+        if busy:
+            query &= ~Q(pk__in=busy)
+    return query
+
+
+def filter_by_tags(queryset, tags):
+    """Машины со всеми тегами: по join на каждый тег через индекс (tag, car)"""
+    for tag in tags:
+        queryset = queryset.filter(tags__slug=slugify(tag, allow_unicode=True))
+    return queryset
+
+
+def query_fleet(params):
+    """Одна страница автопарка: (ids, next_cursor).
+
+    Keyset-пагинация по (order, name, id) — порядок Car.Meta.ordering плюс pk
+    для однозначности; без OFFSET, стоимость страницы не растёт с номером.
+    seats — минимальное число мест, tags — все теги через запятую,
+    available_from/available_to — только свободные на эти даты.
+    """
+    limit = min(max(_integer(params, 'limit', DEFAULT_LIMIT), 1), MAX_LIMIT)
+    query = _filters(params)
+
+    if params.get('cursor'):
+        order, name, pk = decode_cursor(params['cursor'])
+        query &= (
+            Q(order__gt=order)
+            | Q(order=order, name__gt=name)
+            | Q(order=order, name=name, pk__gt=pk)
+        )
+
+    # tags=Sport,Hybrid — имена или slug тегов, нужны все
+    tags = [tag for tag in (tag.strip() for tag in params.get('tags', '').split(',')) if tag]
+    rows = list(
+        filter_by_tags(Car.objects.filter(query), tags)
+        .order_by('order', 'name', 'pk')
+        .values_list('order', 'name', 'pk')[:limit + 1]
+    )
+    next_cursor = encode_cursor(*rows[limit - 1]) if len(rows) > limit else None
+    return [pk for _, _, pk in rows[:limit]], next_cursor
+
+
+def query_tag(tag_slug):
+    """Машины тега для посадочной страницы: (имя тега, ids) одним запросом.
+
+    Join только TaggedCar + Tag по индексу (tag, car); порядок — Car.Meta.ordering.
+    """
+    rows = list(
+        Car.objects.filter(is_active=True, tagged_items__tag__slug=tag_slug)
+        .values_list('pk', 'tagged_items__tag__name')
+    )
+    if not rows:
+        return None, []
+    return rows[0][1], [pk for pk, _ in rows]
+
+
+def reorder_cars(ids):
+    """Сохраняет новый порядок машин: один bulk_update и одна инвалидация кэша.
+
+    ids — pk в новом порядке (например, видимая страница списка в админке).
+    Машины переставляются между своими же местами в общем списке, поэтому
+    положение относительно остальных машин не меняется. Пока order выбранных
+    машин различны, переставляются сами значения; при совпадениях (по умолчанию
+    у всех 0) весь список перенумеровывается шагом ORDER_STEP.
+    """
+    ids = list(dict.fromkeys(ids))
+    cars = Car.objects.only('pk', 'order').in_bulk(ids)
+    ids = [pk for pk in ids if pk in cars]
+
+    slots = sorted(car.order for car in cars.values())
+    if len(set(slots)) == len(slots):
+        orders = dict(zip(ids, slots))
+    else:
+        # Одинаковые order не задают порядок, а order + 1 перепрыгнул бы соседние машины
+        everything = list(Car.objects.only('pk', 'order').order_by('order', 'name', 'pk'))
+        sequence = [car.pk for car in everything]
+        positions = [i for i, pk in enumerate(sequence) if pk in cars]
+        for position, pk in zip(positions, ids):
+            sequence[position] = pk
+        orders = {pk: (i + 1) * ORDER_STEP for i, pk in enumerate(sequence)}
+        cars = {car.pk: car for car in everything}
+
+    changed = []
+    for pk, order in orders.items():
+        car = cars[pk]
+        if car.order != order:
+            car.order = order
+            changed.append(car)
+    if not changed:
+        return 0
+
+    with transaction.atomic():
+        # bulk_update не шлёт post_save — версии поднимаем сами, один раз
+        Car.objects.bulk_update(changed, ['order'])
+        transaction.on_commit(lambda: (bump_version(CATALOG), bump_version(FLEET)))
+    return len(changed)
@@ -0,0 +1,255 @@
+import csv
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from taggit.models import Tag
+
+from ..cache import CATALOG, FLEET, bump_version
+from ..models import Car, CarCategory, TaggedCar
+from .search import update_search_vectors
+
+FORMATS = ('csv', 'jsonl')
+BATCH_SIZE = 500
+
+# Колонки файла: category — slug категории, tags — «Exclusive, Hybrid»
+COLUMNS = (
+    'slug', 'name', 'category', 'description', 'price_per_day',
+    'main_image', 'image_2', 'image_3', 'image_4',
+    'seats', 'transmission', 'tags', 'is_active', 'order',
+)
+TEXT_FIELDS = ('name', 'description', 'main_image', 'image_2', 'image_3', 'image_4', 'transmission')
+# Без них новую машину не создать: NOT NULL / обязательные поля модели
+REQUIRED_FOR_INSERT = ('name', 'category', 'main_image', 'price_per_day')
+
+
+class FleetImportError(ValueError):
+    """Строка файла не может быть импортирована"""
+
+
+def read_rows(stream, fmt):
+    """Строки файла по одной: dict колонка -> значение"""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for number, line in enumerate(stream, start=1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise FleetImportError(f"line {number}: {e}")
+
+
+def write_rows(rows, stream, fmt):
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, COLUMNS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(dict(row, tags=', '.join(row['tags'])))
+        return
+    for row in rows:
+        stream.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+def export_rows(queryset=None, chunk_size=BATCH_SIZE):
+    """Машины построчно; в памяти не больше chunk_size объектов"""
+    if queryset is None:
+        queryset = Car.objects.all()
+    cars = queryset.select_related('category').prefetch_related('tagged_items__tag').order_by('pk')
+    for car in cars.iterator(chunk_size=chunk_size):
+        yield {
+            'slug': car.slug,
+            'name': car.name,
+            'category': car.category.slug,
+            'description': car.description,
+            'price_per_day': str(car.price_per_day),
+            'main_image': car.main_image,
+            'image_2': car.image_2,
+            'image_3': car.image_3,
+            'image_4': car.image_4,
+            'seats': car.seats,
+            'transmission': car.transmission,
+            'tags': car.get_tags_list(),
+            'is_active': car.is_active,
+            'order': car.order,
+        }
+
+
+def _tag_names(value):
+    if isinstance(value, str):
+        value = value.split(',')
+    names = {}
+    for name in value or ():
+        name = str(name).strip()
+        if name:
+            # TAGGIT_CASE_INSENSITIVE: «hybrid» и «Hybrid» — один тег
+            names.setdefault(name.lower(), name)
+    return list(names.values())
+
+
+def _boolean(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y')
+
+
+class _Importer:
+    """Upsert пачками: категории и теги загружаются один раз, без запросов на строку"""
+
+    def __init__(self, columns):
+        unknown = set(columns) - set(COLUMNS)
+        if unknown:
+            raise FleetImportError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        if 'slug' not in columns and 'name' not in columns:
+            raise FleetImportError("Either 'slug' or 'name' column is required")
+
+        self.columns = columns
+        self.update_fields = sorted(set(columns) - {'slug', 'tags'} | {'updated_at'})
+        self.categories = dict(CarCategory.objects.values_list('slug', 'pk'))
+        self.tags = {name.lower(): pk for pk, name in Tag.objects.values_list('pk', 'name')}
+        self.tag_slugs = set(Tag.objects.values_list('slug', flat=True))
+
+    def car(self, line, row):
+        if set(row) != set(self.columns):
+            # update_fields общие для пачки: пропущенная колонка затёрла бы поле значением по умолчанию
+            raise FleetImportError(f"row {line}: columns differ from the first row")
+        car = Car()
+        try:
+            for field in TEXT_FIELDS:
+                if field in row:
+                    setattr(car, field, row[field] or '')
+            if 'category' in row:
+                car.category_id = self.categories[row['category']]
+            if 'price_per_day' in row:
+                car.price_per_day = Decimal(str(row['price_per_day']))
+            if 'seats' in row:
+                car.seats = int(row['seats'])
+            if 'order' in row:
+                car.order = int(row['order'])
+            if 'is_active' in row:
+                car.is_active = _boolean(row['is_active'])
+        except KeyError:
+            raise FleetImportError(f"row {line}: unknown category {row['category']!r}")
+        except (ValueError, TypeError, InvalidOperation) as e:
+            raise FleetImportError(f"row {line}: {e}")
+
+        # slug из имени — как в Car.save(), но без сохранения по одной
+        car.slug = row.get('slug') or slugify(car.name)
+        if not car.slug:
+            raise FleetImportError(f"row {line}: empty slug and name")
+        return car
+
+    def validate(self, line, car, insert):
+        """Проверки модели до bulk_create: иначе пачка падает сырой ошибкой БД без номера строки"""
+        if insert:
+            missing = [field for field in REQUIRED_FOR_INSERT if field not in self.columns]
+            if missing:
+                raise FleetImportError(f"row {line}: new car {car.slug!r} needs columns: {', '.join(missing)}")
+        # Проверяются только поля из файла: остальные у существующей машины не меняются.
+        # category уже сверена со справочником — clean_fields проверял бы её запросом на строку
+        fields = {'slug', *self.columns} - {'tags', 'category'}
+        exclude = [field.name for field in Car._meta.concrete_fields if field.name not in fields]
+        try:
+            car.clean_fields(exclude=exclude)
+            if 'price_per_day' in fields and car.price_per_day <= 0:
+                raise ValidationError({'price_per_day': "Price must be positive."})
+        except ValidationError as e:
+            errors = '; '.join(f"{field}: {' '.join(messages)}" for field, messages in e.message_dict.items())
+            raise FleetImportError(f"row {line}: {errors}")
+
+    def _tag_ids(self, names):
+        ids = []
+        missing = []
+        for name in names:
+            pk = self.tags.get(name.lower())
+            if pk is None:
+                missing.append(name)
+            else:
+                ids.append(pk)
+        if missing:
+            new_tags = []
+            for name in missing:
+                base = slugify(name, allow_unicode=True) or 'tag'
+                slug, n = base, 1
+                while slug in self.tag_slugs:
+                    n += 1
+                    slug = f'{base}_{n}'
+                self.tag_slugs.add(slug)
+                new_tags.append(Tag(name=name, slug=slug))
+            # Без update_conflicts: нужны pk новых тегов (в Django 4.2 их возвращает только INSERT)
+            for tag in Tag.objects.bulk_create(new_tags):
+                self.tags[tag.name.lower()] = tag.pk
+                ids.append(tag.pk)
+        return ids
+
+    def save(self, batch):
+        # Повтор slug в одной пачке: побеждает последняя строка
+        cars = {}
+        tags = {}
+        for line, row in batch:
+            car = self.car(line, row)
+            cars[car.slug] = (line, car)
+            if 'tags' in self.columns:
+                tags[car.slug] = _tag_names(row.get('tags'))
+        existing = dict(Car.objects.filter(slug__in=cars).values_list('slug', 'pk'))
+        for slug, (line, car) in cars.items():
+            self.validate(line, car, insert=slug not in existing)
+
+        # Существующие — UPDATE только колонок файла: INSERT ... ON CONFLICT проверяет
+        # NOT NULL у вставляемой строки и не пропустил бы неполную строку
+        now = timezone.now()
+        inserts, updates = [], []
+        for slug, (line, car) in cars.items():
+            if slug in existing:
+                car.pk = existing[slug]
+                car.updated_at = now
+                updates.append(car)
+            else:
+                inserts.append(car)
+
+        lines = f"rows {batch[0][0]}-{batch[-1][0]}"
+        try:
+            if updates:
+                Car.objects.bulk_update(updates, self.update_fields)
+            ids = dict(existing)
+            ids.update((car.slug, car.pk) for car in Car.objects.bulk_create(inserts))
+
+            if tags:
+                TaggedCar.objects.filter(content_object_id__in=[ids[slug] for slug in tags]).delete()
+                TaggedCar.objects.bulk_create([
+                    TaggedCar(content_object_id=ids[slug], tag_id=tag_id)
+                    for slug, names in tags.items() for tag_id in self._tag_ids(names)
+                ])
+        except (IntegrityError, ValidationError) as e:
+            # Проверки выше ловят известные случаи; здесь — то, что отвергла сама БД
+            # (например, тот же slug вставлен параллельным импортом)
+            raise FleetImportError(f"{lines}: {e}")
+        return list(ids.values())
+
+
+def import_rows(rows, batch_size=BATCH_SIZE):
+    """Upsert машин по slug из потока строк; возвращает число строк.
+
+    Вся загрузка — одна транзакция; bulk_create не шлёт сигналы, поэтому
+    версии кэша поднимаются один раз, а search_vector пересчитывается пачками.
+    """
+    rows = enumerate(rows, start=1)
+    count = 0
+    with transaction.atomic():
+        importer = None
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            if importer is None:
+                importer = _Importer(list(batch[0][1]))
+            ids = importer.save(batch)
+            update_search_vectors(Car.objects.filter(pk__in=ids))
+            count += len(batch)
+        if count:
+            transaction.on_commit(lambda: (bump_version(CATALOG), bump_version(FLEET)))
+    return count
@@ -0,0 +1,131 @@
+import logging
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from ..models import Notification
+from .telegram import DEADLINE, get_client
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 10
+BACKOFF_BASE = 30  # секунд, удваивается с каждой попыткой
+BACKOFF_MAX = 60 * 60
+# Аренда заявки: продлевается перед отправкой каждой заявки, поэтому должна
+# покрывать одну рассылку (telegram.DEADLINE) с запасом, а не всю пачку
+LEASE = timedelta(seconds=DEADLINE * 6)
+
+
+def enqueue_notification(message, source):
+    """Сохраняет заявку в outbox — один INSERT вместо запроса к Telegram"""
+    return Notification.objects.create(message=message, source=source)
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(BACKOFF_BASE * 2 ** (attempts - 1), BACKOFF_MAX))
+
+
+def _deliver(client, notification):
+    """Отправляет заявку тем получателям, которые её ещё не получили"""
+    if not client.configured:
+        return False, 'Telegram is not configured'
+
+    delivered = notification.get_delivered_list()
+    results = client.send(
+        notification.message,
+        [chat_id for chat_id in client.chat_ids if chat_id not in delivered],
+    )
+    delivered += [result.chat_id for result in results if result.ok]
+    notification.delivered_to = ','.join(delivered)
+
+    errors = [f"{result.chat_id}: {result.error}" for result in results if not result.ok]
+    return not errors, '\n'.join(errors)
+
+
+def _claim(batch_size):
+    """Берёт пачку готовых заявок в аренду: короткая транзакция без сетевых вызовов.
+
+    next_attempt_at сдвигается на LEASE — пока аренда не истекла, заявку не возьмёт
+    другой воркер; если воркер умер посреди пачки, заявка вернётся в очередь сама.
+    Значение next_attempt_at — признак владения: записи ниже сверяют его в WHERE.
+    """
+    now = timezone.now()
+    lease = now + LEASE
+    with transaction.atomic():
+        # skip_locked: несколько воркеров на Postgres не возьмут одну строку дважды
+        batch = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status=Notification.Status.PENDING, next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'pk')[:batch_size]
+        )
+        if batch:
+            Notification.objects.filter(pk__in=[notification.pk for notification in batch]).update(
+                next_attempt_at=lease,
+            )
+    for notification in batch:
+        notification.next_attempt_at = lease
+    return batch
+
+
+def _update_leased(notification, **fields):
+    """UPDATE только пока аренда наша; False — заявку перехватил другой воркер"""
+    return bool(Notification.objects.filter(
+        pk=notification.pk,
+        status=Notification.Status.PENDING,
+        next_attempt_at=notification.next_attempt_at,
+    ).update(**fields))
+
+
+def _extend_lease(notification):
+    # Пачка рассылается по очереди: к концу медленной пачки аренда с _claim могла истечь
+    lease = timezone.now() + LEASE
+    if not _update_leased(notification, next_attempt_at=lease):
+        return False
+    notification.next_attempt_at = lease
+    return True
+
+
+def _send(client, notification, max_attempts):
+    """Отправляет одну взятую заявку; None — аренда потеряна и заявка не тронута"""
+    if not _extend_lease(notification):
+        logger.warning("Notification #%s lease was taken over, skipped", notification.pk)
+        return None
+
+    attempts = notification.attempts + 1
+    delivered, error = _deliver(client, notification)
+
+    now = timezone.now()
+    fields = {'attempts': attempts, 'delivered_to': notification.delivered_to}
+    if delivered:
+        fields.update(status=Notification.Status.SENT, sent_at=now, last_error='', next_attempt_at=now)
+    else:
+        fields['last_error'] = error
+        if attempts >= max_attempts:
+            fields['status'] = Notification.Status.DEAD
+            logger.error("Notification #%s dead after %s attempts: %s", notification.pk, attempts, error)
+        else:
+            fields['next_attempt_at'] = now + _backoff(attempts)
+    if not _update_leased(notification, **fields):
+        # Аренду перехватили во время отправки: результат пишет новый владелец
+        logger.warning("Notification #%s lease was taken over during delivery", notification.pk)
+    return delivered
+
+
+def deliver_pending(batch_size=20, max_attempts=MAX_ATTEMPTS):
+    """Доставляет пачку готовых к отправке заявок, возвращает (sent, failed).
+
+    Telegram вызывается вне транзакции, результат каждой заявки сохраняется
+    отдельным UPDATE: INSERT заявок из форм не ждёт сеть (SQLite держит
+    блокировку записи до конца транзакции), а при остановке воркера уже
+    доставленные заявки не откатываются и не отправляются повторно.
+    """
+    client = get_client()
+    sent = failed = 0
+    for notification in _claim(batch_size):
+        delivered = _send(client, notification, max_attempts)
+        if delivered:
+            sent += 1
+        elif delivered is not None:
+            failed += 1
+    return sent, failed
@@ -0,0 +1,132 @@
+import threading
+from collections import OrderedDict, namedtuple
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+
+from ..cache import FLEET, RATES, get_version
+from ..models import LengthDiscount, SeasonalRate
+from .car_cards import get_car_cards
+
+CENT = Decimal('0.01')
+RATES_TIMEOUT = 60 * 60 * 24
+QUOTES_MEMO_SIZE = 256
+
+# Стоимость аренды машины на период
+Quote = namedtuple('Quote', ['car_id', 'days', 'total', 'per_day', 'discount'])
+# Сезонный тариф в компактном виде
+Season = namedtuple('Season', ['start', 'end', 'multiplier', 'category_id'])
+
+# Последний тарифный план процесса: (version, rate_card)
+_local_rates = (None, None)
+# (start, end, версия тарифов, версия автопарка) -> {car_id: Quote}
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def weekend_days(start, end):
+    """Число суббот и воскресений в [start, end) без перебора дней"""
+    days = (end - start).days
+    weeks, rest = divmod(days, 7)
+    first = start.weekday()
+    return weeks * 2 + sum(1 for i in range(rest) if (first + i) % 7 >= 5)
+
+
+class RateCard:
+    """Тарифный план: сезоны, скидки за длительность, наценка выходных.
+
+    Период режется на отрезки между границами сезонов; внутри отрезка
+    коэффициент постоянен, а выходные считаются арифметически — стоимость
+    не зависит от числа дней. Для всего автопарка сумма коэффициентов
+    считается один раз на категорию, дальше — одно умножение на машину.
+    """
+
+    def __init__(self, seasons, discounts, weekend_multiplier):
+        self.seasons = tuple(seasons)
+        # [(min_days, percent), ...] по убыванию min_days
+        self.discounts = tuple(sorted(discounts, reverse=True))
+        self.weekend_multiplier = Decimal(weekend_multiplier)
+
+    def discount(self, days):
+        return next((percent for min_days, percent in self.discounts if days >= min_days), Decimal('0.00'))
+
+    def day_weight(self, start, end, category_id):
+        """Сумма дневных коэффициентов за [start, end) для категории"""
+        seasons = [
+            season for season in self.seasons
+            if season.start < end and season.end > start and season.category_id in (None, category_id)
+        ]
+        bounds = sorted({start, end} | {
+            min(max(date, start), end) for season in seasons for date in (season.start, season.end)
+        })
+
+        total = Decimal(0)
+        for a, b in zip(bounds, bounds[1:]):
+            active = [season for season in seasons if season.start < b and season.end > a]
+            # Тариф категории важнее общего
+            specific = [season for season in active if season.category_id is not None] or active
+            factor = max((season.multiplier for season in specific), default=Decimal(1))
+            weekend = weekend_days(a, b)
+            total += factor * ((b - a).days - weekend + self.weekend_multiplier * weekend)
+        return total
+
+    def quote_fleet(self, cards, start, end):
+        days = (end - start).days
+        discount = self.discount(days)
+        keep = 1 - discount / 100
+        weights = {}
+        quotes = {}
+        for card in cards:
+            weight = weights.get(card.category_id)
+            if weight is None:
+                weight = weights[card.category_id] = self.day_weight(start, end, card.category_id)
+            total = (card.price_per_day * weight * keep).quantize(CENT, ROUND_HALF_UP)
+            quotes[card.id] = Quote(card.id, days, total, (total / days).quantize(CENT, ROUND_HALF_UP), discount)
+        return quotes
+
+
+def _rates_key(version):
+    return f'core:rates:{version}'
+
+
+def get_rate_card():
+    """Тарифный план: память процесса -> общий кэш -> БД"""
+    global _local_rates
+
+    version = get_version(RATES)
+    if _local_rates[0] == version:
+        return _local_rates[1]
+
+    rows = cache.get(_rates_key(version))
+    if rows is None:
+        rows = (
+            tuple(
+                Season(*row) for row in
+                SeasonalRate.objects.values_list('start_date', 'end_date', 'multiplier', 'category_id')
+            ),
+            tuple(LengthDiscount.objects.values_list('min_days', 'percent')),
+        )
+        cache.set(_rates_key(version), rows, RATES_TIMEOUT)
+
+    rate_card = RateCard(*rows, weekend_multiplier=settings.QUOTE_WEEKEND_MULTIPLIER)
+    _local_rates = (version, rate_card)
+    return rate_card
+
+
+def quote_fleet(start, end):
+    """Стоимость аренды всех активных машин на [start, end): {car_id: Quote}"""
+    rate_card = get_rate_card()
+    key = (start, end, get_version(RATES), get_version(FLEET))
+    with _memo_lock:
+        quotes = _memo.get(key)
+        if quotes is not None:
+            _memo.move_to_end(key)
+            return quotes
+
+    quotes = rate_card.quote_fleet(get_car_cards(), start, end)
+    with _memo_lock:
+        _memo[key] = quotes
+        while len(_memo) > QUOTES_MEMO_SIZE:
+            _memo.popitem(last=False)
+    return quotes
@@ -0,0 +1,183 @@
+import re
+import unicodedata
+from bisect import bisect_left
+from difflib import get_close_matches
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector, TrigramWordSimilarity
+from django.db import connection
+from django.db.models import F, TextField, Value
+
+from ..cache import FLEET, get_version
+from ..models import Car
+from .car_cards import get_car_cards, get_car_cards_by_ids
+
+SEARCH_LIMIT = 20
+SEARCH_CONFIG = 'simple'  # марки и модели не стеммятся, тексты на en/it
+TRIGRAM_THRESHOLD = 0.4
+
+# Веса полей: имя важнее категории и тегов, описание — меньше всего
+NAME_WEIGHT, META_WEIGHT, TEXT_WEIGHT = 3, 2, 1
+
+_TOKEN_RE = re.compile(r'\w+')
+
+# Последний индекс процесса: (version, index)
+_local_index = (None, None)
+
+
+def tokenize(text):
+    """Слова в нижнем регистре без диакритики: «Città» и «citta» совпадают"""
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return _TOKEN_RE.findall(text)
+
+
+def document(name, category_name, tags, seats, transmission, description):
+    """Текст машины для поиска: (имя, категория/теги/места, описание)"""
+    meta = ' '.join([category_name, *tags, f'{seats} seats', transmission])
+    return name, meta, description
+
+
+class SearchIndex:
+    """Инвертированный индекс в памяти для SQLite: токен -> {pk: вес}.
+
+    Все слова запроса обязательны, последнее ищется по префиксу («lambo»);
+    если совпадений нет — опечатки исправляются по словарю индекса.
+    """
+
+    def __init__(self, documents):
+        # documents: [(pk, (name, meta, description)), ...] в порядке вывода
+        self.postings = {}
+        self.position = {}
+        for position, (pk, fields) in enumerate(documents):
+            self.position[pk] = position
+            for weight, text in zip((NAME_WEIGHT, META_WEIGHT, TEXT_WEIGHT), fields):
+                for token in tokenize(text):
+                    scores = self.postings.setdefault(token, {})
+                    if scores.get(pk, 0) < weight:
+                        scores[pk] = weight
+        self.vocabulary = sorted(self.postings)
+
+    def _expand(self, token, prefix):
+        if not prefix:
+            return [token] if token in self.postings else []
+        start = bisect_left(self.vocabulary, token)
+        matches = []
+        for word in self.vocabulary[start:]:
+            if not word.startswith(token):
+                break
+            matches.append(word)
+        return matches
+
+    def _fuzzy(self, token):
+        # Опечатки ищем среди слов на ту же букву — не сравниваем со всем словарём
+        start = bisect_left(self.vocabulary, token[0])
+        end = bisect_left(self.vocabulary, chr(ord(token[0]) + 1))
+        return get_close_matches(token, self.vocabulary[start:end], n=3, cutoff=0.75)
+
+    def _scores(self, words):
+        scores = {}
+        for word in words:
+            for pk, weight in self.postings[word].items():
+                if scores.get(pk, 0) < weight:
+                    scores[pk] = weight
+        return scores
+
+    def search(self, query, limit=SEARCH_LIMIT):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        total = None
+        for i, token in enumerate(tokens):
+            words = self._expand(token, prefix=i == len(tokens) - 1)
+            if not words:
+                words = self._fuzzy(token)
+            scores = self._scores(words)
+            if total is None:
+                total = scores
+            else:
+                total = {pk: total[pk] + weight for pk, weight in scores.items() if pk in total}
+            if not total:
+                return []
+
+        ranked = sorted(total, key=lambda pk: (-total[pk], self.position[pk]))
+        return ranked[:limit]
+
+
+def get_search_index():
+    """Индекс по карточкам автопарка, пересобирается при смене версии FLEET"""
+    global _local_index
+
+    version = get_version(FLEET)
+    if _local_index[0] != version:
+        index = SearchIndex(
+            (card.id, document(
+                card.name, card.category_name, card.tags, card.seats, card.transmission, card.description,
+            ))
+            for card in get_car_cards()
+        )
+        _local_index = (version, index)
+    return _local_index[1]
+
+
+def _tsquery(tokens):
+    # Токены — только \w+, безопасно для raw; последний — префикс
+    return ' & '.join(tokens[:-1] + [f'{tokens[-1]}:*'])
+
+
+def postgres_search(queryset, query, limit):
+    """pk машин queryset по полнотекстовому запросу, с запасным поиском по триграммам"""
+    tokens = tokenize(query)
+    if not tokens:
+        return []
+
+    search_query = SearchQuery(_tsquery(tokens), search_type='raw', config=SEARCH_CONFIG)
+    ids = list(
+        queryset.filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F('search_vector'), search_query))
+        .order_by('-rank', 'order', 'name')
+        .values_list('pk', flat=True)[:limit]
+    )
+    if ids:
+        return ids
+
+    # Опечатки: «lamborgini» — по триграммам имени (pg_trgm)
+    return list(
+        queryset.annotate(similarity=TrigramWordSimilarity(query, 'name'))
+        .filter(similarity__gte=TRIGRAM_THRESHOLD)
+        .order_by('-similarity', 'order', 'name')
+        .values_list('pk', flat=True)[:limit]
+    )
+
+
+def search_car_ids(query, limit=SEARCH_LIMIT):
+    """pk активных машин по запросу, по убыванию релевантности"""
+    if connection.vendor == 'postgresql':
+        return postgres_search(Car.objects.filter(is_active=True), query, limit)
+    return get_search_index().search(query, limit)
+
+
+def search_cars(query, limit=SEARCH_LIMIT):
+    return get_car_cards_by_ids(search_car_ids(query, limit))
+
+
+def update_search_vectors(queryset):
+    """Пересчитывает Car.search_vector (только PostgreSQL)"""
+    if connection.vendor != 'postgresql':
+        return 0
+
+    count = 0
+    for car in queryset.select_related('category').prefetch_related('tagged_items__tag'):
+        fields = document(
+            car.name, car.category.name, car.get_tags_list(), car.seats, car.transmission, car.description,
+        )
+        # Значения, а не поля: категория и теги в других таблицах, UPDATE без join.
+        # Текст уже нормализован tokenize — как и запрос в postgres_search
+        vector = None
+        for weight, text in zip('ABC', fields):
+            part = SearchVector(
+                Value(' '.join(tokenize(text)), output_field=TextField()), weight=weight, config=SEARCH_CONFIG,
+            )
+            vector = part if vector is None else vector + part
+        count += Car.objects.filter(pk=car.pk).update(search_vector=vector)
+    return count
@@ -0,0 +1,133 @@
+from collections import namedtuple
+
+from django.core.cache import cache
+
+from ..cache import SNIPPETS, get_version
+from ..models import CodeSnippet
+from ..timing import record_cache
+
+# Шаблонам нужны только name и code — храним компактные кортежи, а не модели
+SnippetEntry = namedtuple('SnippetEntry', ['name', 'code'])
+
+LOCATIONS = ('head_start', 'head_end', 'body_start', 'body_end')
+
+INDEX_TIMEOUT = 60 * 60 * 24
+
+# Последний скомпилированный индекс процесса: (version, index)
+_local_index = (None, None)
+
+
+def _split_rules(text):
+    return [url.strip() for url in text.strip().split('\n') if url.strip()]
+
+
+class SnippetIndex:
+    """Скомпилированный индекс snippets: автомат Ахо-Корасик по всем URL-правилам.
+
+    Семантика совпадает с CodeSnippet.should_show_on_path (правило — подстрока пути),
+    но путь сканируется один раз, а не по разу на каждое правило каждого snippet.
+    """
+
+    def __init__(self, snippets):
+        self.entries = []
+        self.location_masks = dict.fromkeys(LOCATIONS, 0)
+        self.show_all_mask = 0
+        # Автомат: переходы, суффиксные ссылки и маски (exclude, show) на узел
+        self.goto = [{}]
+        self.fail = [0]
+        self.exclude = [0]
+        self.show = [0]
+
+        for bit, snippet in enumerate(snippets):
+            mask = 1 << bit
+            self.entries.append(SnippetEntry(snippet.name, snippet.code))
+            if snippet.location in self.location_masks:
+                self.location_masks[snippet.location] |= mask
+            if snippet.show_on_all_pages:
+                self.show_all_mask |= mask
+            for url in _split_rules(snippet.exclude_urls):
+                self.exclude[self._add(url)] |= mask
+            if not snippet.show_on_all_pages:
+                for url in _split_rules(snippet.show_on_urls):
+                    self.show[self._add(url)] |= mask
+
+        self._link()
+        self.default = self._resolve_mask(self.show_all_mask)
+
+    def _add(self, pattern):
+        state = 0
+        for char in pattern:
+            nxt = self.goto[state].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto.append({})
+                self.fail.append(0)
+                self.exclude.append(0)
+                self.show.append(0)
+                self.goto[state][char] = nxt
+            state = nxt
+        return state
+
+    def _link(self):
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, nxt in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                # Узел наследует маски всех своих суффиксов
+                self.exclude[nxt] |= self.exclude[self.fail[nxt]]
+                self.show[nxt] |= self.show[self.fail[nxt]]
+                queue.append(nxt)
+
+    def _resolve_mask(self, visible):
+        result = {}
+        for location, location_mask in self.location_masks.items():
+            mask = visible & location_mask
+            result[location] = tuple(
+                entry for bit, entry in enumerate(self.entries) if mask >> bit & 1
+            )
+        return result
+
+    def resolve(self, path):
+        """Возвращает {location: (SnippetEntry, ...)} для пути"""
+        if len(self.goto) == 1:
+            return self.default
+
+        goto, fail = self.goto, self.fail
+        exclude = show = state = 0
+        for char in path:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            exclude |= self.exclude[state]
+            show |= self.show[state]
+
+        if not exclude and not show:
+            return self.default
+        return self._resolve_mask((self.show_all_mask | show) & ~exclude)
+
+
+def _index_key(version):
+    return f'core:snippets:index:{version}'
+
+
+def get_snippet_index():
+    """Индекс активных snippets: память процесса -> общий кэш -> БД"""
+    global _local_index
+
+    version = get_version(SNIPPETS)
+    local_version, index = _local_index
+    if local_version == version:
+        return index
+
+    index = cache.get(_index_key(version))
+    record_cache('snippets', index is not None)
+    if index is None:
+        index = SnippetIndex(CodeSnippet.objects.filter(is_active=True))
+        cache.set(_index_key(version), index, INDEX_TIMEOUT)
+
+    _local_index = (version, index)
+    return index
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from PIL import Image, features
+
+logger = logging.getLogger(__name__)
+
+SOURCE_PREFIX = 'images'
+OUTPUT_PREFIX = 'optimized'
+MANIFEST_NAME = f'{OUTPUT_PREFIX}/manifest.json'
+
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+WIDTHS = (480, 768, 1024, 1440, 1920)
+FORMATS = (
+    # (формат, расширение, параметры сохранения)
+    ('avif', 'avif', {'quality': 55, 'speed': 8}),
+    ('webp', 'webp', {'quality': 78, 'method': 4}),
+)
+
+
+def source_dir():
+    return Path(apps.get_app_config('core').path) / 'static' / SOURCE_PREFIX
+
+
+def output_dir():
+    # STATICFILES_DIRS[0] — сгенерированное не смешивается с исходниками в core/static
+    return Path(settings.STATICFILES_DIRS[0])
+
+
+def _file_hash(path):
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _supported_formats():
+    return [fmt for fmt in FORMATS if features.check(fmt[0])]
+
+
+def _encode(source, rel_name, digest, formats):
+    """Кодирует одно изображение во все форматы и ширины, возвращает запись манифеста"""
+    with Image.open(source) as image:
+        image.load()
+        width, height = image.size
+        # Без EXIF/ICC и прочих метаданных: сохраняем только пиксели
+        mode = 'RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB'
+        pixels = image.convert(mode)
+
+    steps = [w for w in WIDTHS if w < width] + [width]
+    stem = Path(rel_name).with_suffix('').as_posix()
+    entry = {'hash': digest, 'width': width, 'height': height, 'sources': {}}
+
+    for fmt, ext, options in formats:
+        variants = []
+        for step in steps:
+            name = f'{OUTPUT_PREFIX}/{stem}-{step}.{digest[:8]}.{ext}'
+            target = output_dir() / name
+            target.parent.mkdir(parents=True, exist_ok=True)
+            resized = pixels if step == width else pixels.resize(
+                (step, round(height * step / width)), Image.LANCZOS,
+            )
+            resized.save(target, fmt.upper(), **options)
+            variants.append([step, name])
+        entry['sources'][f'image/{fmt}'] = variants
+    return entry
+
+
+def optimize_images(force=False):
+    """Генерирует AVIF/WebP варианты для core/static/images.
+
+    Перекодирует только изображения, у которых изменился хэш содержимого.
+    Возвращает (encoded, skipped).
+    """
+    manifest_path = output_dir() / MANIFEST_NAME
+    old_manifest = {}
+    if manifest_path.exists() and not force:
+        old_manifest = json.loads(manifest_path.read_text())
+
+    formats = _supported_formats()
+    manifest = {}
+    encoded = skipped = 0
+    for source in sorted(source_dir().rglob('*')):
+        if source.suffix.lower() not in SOURCE_EXTENSIONS:
+            continue
+        rel_name = source.relative_to(source_dir()).as_posix()
+        key = f'{SOURCE_PREFIX}/{rel_name}'
+        digest = _file_hash(source)
+        with Image.open(source) as image:
+            if image.width <= WIDTHS[0]:
+                continue  # иконки и мелочь — выигрыш меньше накладных расходов
+
+        previous = old_manifest.get(key)
+        if previous and previous['hash'] == digest and all(
+            (output_dir() / name).exists()
+            for variants in previous['sources'].values()
+            for _, name in variants
+        ):
+            manifest[key] = previous
+            skipped += 1
+            continue
+
+        manifest[key] = _encode(source, rel_name, digest, formats)
+        encoded += 1
+        logger.info("Optimized %s", key)
+
+    # Удаляем варианты изображений, которых больше нет или которые перекодированы
+    keep = {name for entry in manifest.values() for variants in entry['sources'].values() for _, name in variants}
+    for entry in old_manifest.values():
+        for variants in entry['sources'].values():
+            for _, name in variants:
+                if name not in keep:
+                    (output_dir() / name).unlink(missing_ok=True)
+
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    manifest_path.write_text(json.dumps(manifest, indent=1, sort_keys=True))
+    _manifest_cache.clear()
+    return encoded, skipped
+
+
+_manifest_cache = {}
+
+
+def load_manifest():
+    """Манифест оптимизированных изображений (читается один раз на процесс)"""
+    if 'manifest' not in _manifest_cache:
+        path = finders.find(MANIFEST_NAME)
+        manifest = {}
+        if path:
+            with open(path) as f:
+                manifest = json.load(f)
+        _manifest_cache['manifest'] = manifest
+    return _manifest_cache['manifest']
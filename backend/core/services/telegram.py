@@ -1,30 +1,105 @@
+import logging
 import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from .. import metrics
+from ..timing import measure
+
+logger = logging.getLogger(__name__)
+
+API_URL = "https://api.telegram.org/bot{token}/sendMessage"
+
+CONNECT_TIMEOUT = 3
+DEADLINE = 10  # секунд на всю рассылку по всем получателям
+
+# Результат отправки одному получателю
+DeliveryResult = namedtuple('DeliveryResult', ['chat_id', 'ok', 'status_code', 'error', 'elapsed'])
+
+
+class TelegramClient:
+    """Клиент Telegram: keep-alive сессия и параллельная рассылка с общим дедлайном"""
+
+    def __init__(self, token, chat_ids, deadline=DEADLINE):
+        self.url = API_URL.format(token=token) if token else None
+        self.chat_ids = tuple(chat_ids)
+        self.deadline = deadline
+        self.session = requests.Session()
+        pool_size = max(len(self.chat_ids), 1)
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=pool_size))
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='telegram')
+
+    @classmethod
+    def from_env(cls):
+        allowed_ids = os.getenv('TELEGRAM_CHAT_ID', '')
+        return cls(
+            token=os.getenv('TELEGRAM_BOT_TOKEN'),
+            chat_ids=[cid.strip() for cid in allowed_ids.split(',') if cid.strip()],
+        )
+
+    @property
+    def configured(self):
+        return bool(self.url and self.chat_ids)
+
+    def _send_one(self, chat_id, message, timeout):
+        started = time.monotonic()
+        try:
+            response = self.session.post(self.url, data={
+                'chat_id': chat_id,
+                'text': message,
+                'parse_mode': 'HTML',
+            }, timeout=(CONNECT_TIMEOUT, timeout))
+            ok = response.ok and response.json().get('ok', False)
+            error = '' if ok else response.text[:500]
+            return DeliveryResult(chat_id, ok, response.status_code, error, time.monotonic() - started)
+        except (requests.RequestException, ValueError) as e:
+            return DeliveryResult(chat_id, False, None, repr(e), time.monotonic() - started)
+
+    def send(self, message, chat_ids=None):
+        """Рассылает сообщение получателям, возвращает список DeliveryResult"""
+        chat_ids = self.chat_ids if chat_ids is None else tuple(chat_ids)
+        if not self.url or not chat_ids:
+            return []
+
+        futures = {
+            self.executor.submit(self._send_one, chat_id, message, self.deadline): chat_id
+            for chat_id in chat_ids
+        }
+        with measure('telegram'):
+            done, not_done = wait(futures, timeout=self.deadline)
+
+        results = [future.result() for future in done]
+        for future in not_done:
+            future.cancel()
+            results.append(DeliveryResult(futures[future], False, None, 'Deadline exceeded', self.deadline))
+
+        for result in results:
+            metrics.TELEGRAM_SECONDS.observe(result.elapsed, 'ok' if result.ok else 'failed')
+            if not result.ok:
+                reason = f'http_{result.status_code}' if result.status_code else (
+                    'deadline' if result.error == 'Deadline exceeded' else 'network'
+                )
+                metrics.TELEGRAM_FAILURES.inc(reason)
+                logger.warning("Telegram delivery to %s failed: %s", result.chat_id, result.error)
+        return results
+
+
+_client = None
+
+
+def get_client():
+    """Общий клиент процесса (создаётся при первом обращении, уже после fork)"""
+    global _client
+    if _client is None:
+        _client = TelegramClient.from_env()
+    return _client
 
 
 def send_telegram(message):
     """Отправка в Telegram только разрешённым пользователям"""
-    token = os.getenv('TELEGRAM_BOT_TOKEN')
-    allowed_ids = os.getenv('TELEGRAM_CHAT_ID', '')
-    
-    if not token or not allowed_ids:
-        return False
-    
-    url = f"https://api.telegram.org/bot{token}/sendMessage"
-    allowed_list = [cid.strip() for cid in allowed_ids.split(',') if cid.strip()]
-    
-    if not allowed_list:
-        return False
-    
-    success = True
-    for chat_id in allowed_list:
-        try:
-            requests.post(url, data={
-                'chat_id': chat_id, 
-                'text': message, 
-                'parse_mode': 'HTML'
-            })
-        except:
-            success = False
-    
-    return success
\ No newline at end of file
+    results = get_client().send(message)
+    return bool(results) and all(result.ok for result in results)
@@ -0,0 +1,97 @@
+# backend/core/signals.py
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from taggit.models import Tag
+
+from .cache import CATALOG, FLEET, RATES, RESERVATIONS, SNIPPETS, bump_version
+from .models import Car, CarCategory, CarImage, CodeSnippet, LengthDiscount, Reservation, SeasonalRate, TaggedCar
+from .services.search import update_search_vectors
+
+
+@receiver([post_save, post_delete], sender=CodeSnippet)
+def invalidate_snippets(sender, **kwargs):
+    """Сбрасывает скомпилированный индекс snippets после коммита"""
+    transaction.on_commit(lambda: bump_version(SNIPPETS))
+
+
+@receiver([post_save, post_delete], sender=Car)
+@receiver([post_save, post_delete], sender=CarImage)
+@receiver([post_save, post_delete], sender=CarCategory)
+@receiver([post_save, post_delete], sender=CodeSnippet)
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_catalog(sender, **kwargs):
+    """Новая версия каталога — закэшированные страницы больше не читаются"""
+    transaction.on_commit(lambda: bump_version(CATALOG))
+
+
+@receiver([post_save, post_delete], sender=Car)
+@receiver([post_save, post_delete], sender=CarImage)
+@receiver([post_save, post_delete], sender=CarCategory)
+@receiver([post_save, post_delete], sender=Tag)
+def invalidate_fleet(sender, **kwargs):
+    """Фрагмент автопарка зависит только от машин (фото и slug категории в URL)"""
+    transaction.on_commit(lambda: bump_version(FLEET))
+
+
+@receiver(m2m_changed, sender=TaggedCar)
+def invalidate_car_tags(sender, action, **kwargs):
+    """car.tags.add()/set() не вызывают post_save у Car"""
+    if action.startswith('post_'):
+        transaction.on_commit(lambda: (bump_version(CATALOG), bump_version(FLEET)))
+
+
+@receiver(post_save, sender=Car)
+def update_car_search(sender, instance, **kwargs):
+    """search_vector машины — после коммита, когда сохранены и теги"""
+    transaction.on_commit(lambda: update_search_vectors(Car.objects.filter(pk=instance.pk)))
+
+
+@receiver(m2m_changed, sender=TaggedCar)
+def update_car_tags_search(sender, instance, action, **kwargs):
+    if action.startswith('post_') and isinstance(instance, Car):
+        transaction.on_commit(lambda: update_search_vectors(Car.objects.filter(pk=instance.pk)))
+
+
+@receiver(post_save, sender=CarCategory)
+def update_category_search(sender, instance, **kwargs):
+    transaction.on_commit(lambda: update_search_vectors(Car.objects.filter(category=instance)))
+
+
+@receiver(post_save, sender=Tag)
+def update_tag_search(sender, instance, **kwargs):
+    transaction.on_commit(lambda: update_search_vectors(Car.objects.filter(tagged_items__tag=instance)))
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=CarCategory)
+def collect_deleted_search(sender, instance, **kwargs):
+    """Машины удаляемого тега или категории: после удаления связей их уже не найти"""
+    if sender is Tag:
+        cars = Car.objects.filter(tagged_items__tag=instance)
+    else:
+        cars = Car.objects.filter(category=instance)
+    instance._search_car_ids = list(cars.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=CarCategory)
+def update_deleted_search(sender, instance, **kwargs):
+    """Термины удалённого тега не должны находиться /api/search/ (машины категории
+    удаляются каскадом — для них UPDATE просто ничего не найдёт)"""
+    ids = getattr(instance, '_search_car_ids', [])
+    if ids:
+        transaction.on_commit(lambda: update_search_vectors(Car.objects.filter(pk__in=ids)))
+
+
+@receiver([post_save, post_delete], sender=Reservation)
+def invalidate_reservations(sender, **kwargs):
+    """Занятость на страницах машин и в API автопарка"""
+    transaction.on_commit(lambda: (bump_version(RESERVATIONS), bump_version(CATALOG)))
+
+
+@receiver([post_save, post_delete], sender=SeasonalRate)
+@receiver([post_save, post_delete], sender=LengthDiscount)
+def invalidate_rates(sender, **kwargs):
+    """Новый тарифный план — расчёты стоимости пересчитываются"""
+    transaction.on_commit(lambda: bump_version(RATES))
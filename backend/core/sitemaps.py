@@ -1,12 +1,30 @@
+import gzip
+import hashlib
+from calendar import timegm
+
 from django.contrib.sitemaps import Sitemap
+from django.contrib.sitemaps.views import sitemap
+from django.core.cache import cache
+from django.db.models import Max
 from django.urls import reverse
-from .models import Car
+from django.utils import timezone
+
+from .cache import CATALOG, get_version
+from .models import Car, CarCategory
+from .services import get_car_cards
+from .timing import measure, record_cache
+
+SITEMAP_TIMEOUT = 60 * 60 * 24
 
 
 class StaticSitemap(Sitemap):
     protocol = "https"
     changefreq = "monthly"
     priority = 0.5
+    # /it/... альтернативы из i18n_patterns + hreflang в каждом <url>
+    i18n = True
+    alternates = True
+    x_default = True
 
     def items(self):
         return [
@@ -31,12 +49,49 @@ class CarSitemap(Sitemap):
     protocol = "https"
     changefreq = "weekly"
     priority = 0.9
+    i18n = True
+    alternates = True
+    x_default = True
 
     def items(self):
-        return Car.objects.filter(is_active=True).select_related('category')
+        return get_car_cards()
 
     def location(self, obj):
-        return obj.get_absolute_url()
+        # reverse, а не get_absolute_url — нужен языковой префикс для /it/
+        return reverse('car_detail', kwargs={'category_slug': obj.category_slug, 'car_slug': obj.slug})
 
     def lastmod(self, obj):
-        return obj.created_at
\ No newline at end of file
+        return obj.lastmod
+
+
+SITEMAPS = {
+    'static': StaticSitemap,
+    'cars': CarSitemap,
+}
+
+
+def get_sitemap(request):
+    """sitemap.xml собирается один раз на версию каталога.
+
+    Возвращает (xml, xml_gzip, etag, last_modified) — в кэше лежат готовые байты.
+    """
+    key = f'core:sitemap:{get_version(CATALOG)}:{request.get_host()}'
+    cached = cache.get(key)
+    record_cache('sitemap', cached is not None)
+    if cached is None:
+        response = sitemap(request, sitemaps=SITEMAPS)
+        with measure('tpl'):
+            response.render()
+        content = response.content
+        last_modified = max(filter(None, [
+            Car.objects.aggregate(Max('updated_at'))['updated_at__max'],
+            CarCategory.objects.aggregate(Max('updated_at'))['updated_at__max'],
+        ]), default=timezone.now())
+        cached = (
+            content,
+            gzip.compress(content, mtime=0),
+            hashlib.md5(content).hexdigest(),
+            timegm(last_modified.utctimetuple()),
+        )
+        cache.set(key, cached, SITEMAP_TIMEOUT)
+    return cached
@@ -0,0 +1,70 @@
+# backend/core/storage.py
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # без brotli собираем только .gz
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени + готовые .gz/.br рядом с файлами.
+
+    Хэшированные имена можно отдавать как immutable, а nginx берёт
+    сжатые копии через gzip_static, не тратя CPU на каждый запрос.
+    """
+
+    manifest_strict = False
+    compress_extensions = ('.css', '.js', '.map', '.svg', '.json', '.txt', '.xml', '.ttf', '.eot', '.otf', '.ico')
+    min_compress_size = 512
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Файла нет в STATIC_ROOT (тесты, dev без collectstatic) — отдаём как есть
+            return name
+
+    def url_converter(self, name, hashed_files, template=None):
+        converter = super().url_converter(name, hashed_files, template)
+
+        def safe_converter(matchobj):
+            try:
+                return converter(matchobj)
+            except ValueError:
+                # Битые ссылки в vendor CSS/JS (шрифты, картинки темы) оставляем как есть
+                return matchobj.group(0)
+
+        return safe_converter
+
+    def post_process(self, paths, dry_run=False, **options):
+        compress = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            # Сжимаем только хэшированные копии — на них ссылаются шаблоны
+            if hashed_name and not isinstance(processed, Exception):
+                compress.add(hashed_name)
+            yield name, hashed_name, processed
+
+        if not dry_run:
+            for name in sorted(compress):
+                if name.endswith(self.compress_extensions):
+                    self._compress(name)
+
+    def _compress(self, name):
+        with self.open(name) as f:
+            content = f.read()
+        if len(content) < self.min_compress_size:
+            return
+
+        variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content, quality=11)))
+
+        for suffix, compressed in variants:
+            # Сжатая копия имеет смысл, только если она заметно меньше
+            if len(compressed) < len(content) * 0.95:
+                path = self.path(name + suffix)
+                with open(path, 'wb') as f:
+                    f.write(compressed)
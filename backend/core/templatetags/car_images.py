@@ -0,0 +1,42 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from ..services.car_cards import CardImage, build_card_image
+
+register = template.Library()
+
+
+def _card_image(car, field):
+    # У CarCard фото уже собраны, у Car — собираем из prefetch local_images
+    image = getattr(car, field)
+    if isinstance(image, CardImage) or image is None:
+        return image
+    return build_card_image(car, field)
+
+
+@register.simple_tag
+def car_image_url(car, field='main_image'):
+    """URL полноразмерного фото: локальная копия или исходный URL"""
+    image = _card_image(car, field)
+    return image.url if image else ''
+
+
+@register.simple_tag
+def car_image(car, field='main_image', sizes='100vw', **attrs):
+    """<img> с srcset/sizes по WebP-вариантам и реальными width/height.
+
+    Принимает Car или CarCard. Пока фото не загружено локально, отдаёт исходный URL.
+    """
+    attrs.setdefault('alt', car.name)
+    image = _card_image(car, field)
+    if image is None:
+        return ''
+    if not image.srcset:
+        return format_html('<img src="{}"{}>', image.src, flatatt(attrs))
+
+    attrs.setdefault('width', image.width)
+    attrs.setdefault('height', image.height)
+    return format_html(
+        '<img src="{}" srcset="{}" sizes="{}"{}>', image.src, image.srcset, sizes, flatatt(attrs),
+    )
@@ -0,0 +1,52 @@
+from django import template
+from django.core.cache import cache
+from django.middleware.csrf import get_token
+from django.utils.safestring import mark_safe
+
+from ..cache import CSRF_PLACEHOLDER, FRAGMENT_TIMEOUT, NAMESPACES, fragment_key
+from ..timing import record_cache
+
+register = template.Library()
+
+
+class FragmentNode(template.Node):
+    def __init__(self, nodelist, name, depends):
+        self.nodelist = nodelist
+        self.name = name
+        self.depends = depends
+
+    def render(self, context):
+        key = fragment_key(self.name, self.depends)
+        content = cache.get(key)
+        record_cache('fragment', content is not None)
+        if content is None:
+            # Рендерим с CSRF-заглушкой: одна копия фрагмента на всех посетителей
+            with context.push(csrf_token=CSRF_PLACEHOLDER):
+                content = self.nodelist.render(context)
+            cache.set(key, content, FRAGMENT_TIMEOUT)
+
+        request = context.get('request')
+        # Внутри cache_catalog_page заглушку заменит страница при отдаче
+        if request is not None and CSRF_PLACEHOLDER in content and str(context.get('csrf_token')) != CSRF_PLACEHOLDER:
+            content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+        return mark_safe(content)
+
+
+@register.tag
+def fragment(parser, token):
+    """Кэширует фрагмент по языку и версиям данных, от которых он зависит.
+
+        {% fragment 'mainpage:about' %}...{% endfragment %}
+        {% fragment 'mainpage:fleet' 'fleet' %}...{% endfragment %}
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name")
+    name, *depends = [bit.strip('\'"') for bit in bits[1:]]
+    unknown = set(depends) - set(NAMESPACES)
+    if unknown:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' unknown dependencies: {', '.join(sorted(unknown))}")
+
+    nodelist = parser.parse(('endfragment',))
+    parser.delete_first_token()
+    return FragmentNode(nodelist, name, tuple(depends))
@@ -0,0 +1,34 @@
+from django import template
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from ..services.static_images import load_manifest
+
+register = template.Library()
+
+
+@register.simple_tag
+def picture(path, sizes='100vw', **attrs):
+    """<picture> с AVIF/WebP-источниками из манифеста optimize_static_images.
+
+    Если изображение ещё не оптимизировано, выводит обычный <img>.
+    """
+    entry = load_manifest().get(path)
+    if entry is None:
+        return format_html('<img src="{}"{}>', static(path), flatatt(attrs))
+
+    attrs.setdefault('width', entry['width'])
+    attrs.setdefault('height', entry['height'])
+    sources = format_html_join(
+        '', '<source type="{}" srcset="{}" sizes="{}">',
+        (
+            (mime, ', '.join(f'{static(name)} {width}w' for width, name in variants), sizes)
+            for mime, variants in entry['sources'].items()
+        ),
+    )
+    # display: contents — <picture> не участвует в раскладке, CSS для img не меняется
+    return format_html(
+        '<picture style="display: contents">{}<img src="{}"{}></picture>',
+        sources, static(path), flatatt(attrs),
+    )
@@ -0,0 +1,39 @@
+from django.test import TestCase
+
+from core.models import Car, CarCategory
+from core.services.fleet import reorder_cars
+
+
+class ReorderCarsTests(TestCase):
+    def setUp(self):
+        self.category = CarCategory.objects.create(name='SUV', slug='suv')
+
+    def car(self, name, order):
+        return Car.objects.create(
+            category=self.category, name=name, price_per_day=100,
+            main_image='https://example.com/car.jpg', order=order,
+        )
+
+    def names(self):
+        return list(Car.objects.values_list('name', flat=True))
+
+    def test_distinct_orders_are_permuted(self):
+        a, b, c = self.car('A', 1), self.car('B', 2), self.car('C', 3)
+        self.assertEqual(reorder_cars([c.pk, a.pk]), 2)
+        self.assertEqual(self.names(), ['C', 'B', 'A'])
+        self.assertEqual(list(Car.objects.values_list('order', flat=True)), [1, 2, 3])
+
+    def test_equal_orders_keep_off_page_cars_in_place(self):
+        before = self.car('Before', 4)
+        a, b, c = self.car('A', 5), self.car('B', 5), self.car('C', 5)
+        off_page = self.car('Off page', 6)
+
+        reorder_cars([c.pk, a.pk, b.pk])
+
+        self.assertEqual(self.names(), ['Before', 'C', 'A', 'B', 'Off page'])
+        orders = list(Car.objects.values_list('order', flat=True))
+        self.assertEqual(len(set(orders)), len(orders))
+
+    def test_unchanged_order_writes_nothing(self):
+        a, b = self.car('A', 1), self.car('B', 2)
+        self.assertEqual(reorder_cars([a.pk, b.pk]), 0)
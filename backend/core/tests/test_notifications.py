@@ -0,0 +1,75 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Notification
+from core.services import notifications
+from core.services.telegram import DeliveryResult
+
+
+class FakeClient:
+    configured = True
+    chat_ids = ('1',)
+
+    def __init__(self, on_send=None):
+        self.sent = []
+        self.on_send = on_send
+
+    def send(self, message, chat_ids):
+        self.sent.append(message)
+        if self.on_send:
+            self.on_send()
+        return [DeliveryResult(chat_id, True, 200, '', 0.1) for chat_id in chat_ids]
+
+
+class OverlappingClaimTests(TestCase):
+    def setUp(self):
+        self.started = timezone.now()
+        self.notification = Notification.objects.create(message='lead', source='test')
+        Notification.objects.filter(pk=self.notification.pk).update(next_attempt_at=self.started)
+
+    def at(self, offset):
+        return mock.patch.object(notifications.timezone, 'now', return_value=self.started + offset)
+
+    def test_expired_lease_is_not_sent_by_previous_owner(self):
+        client = FakeClient()
+        with self.at(timedelta(0)):
+            (first,) = notifications._claim(20)
+        # Пачка первого воркера рассылалась дольше LEASE — заявку взял второй
+        with self.at(notifications.LEASE + timedelta(seconds=1)):
+            (second,) = notifications._claim(20)
+            self.assertIsNone(notifications._send(client, first, notifications.MAX_ATTEMPTS))
+            self.assertTrue(notifications._send(client, second, notifications.MAX_ATTEMPTS))
+
+        self.assertEqual(client.sent, ['lead'])
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, Notification.Status.SENT)
+        self.assertEqual(self.notification.attempts, 1)
+
+    def test_result_is_not_written_after_lease_takeover(self):
+        taken = []
+
+        def take_over():
+            with self.at(notifications.LEASE * 3):
+                taken.extend(notifications._claim(20))
+
+        with self.at(timedelta(0)):
+            (first,) = notifications._claim(20)
+        with self.at(notifications.LEASE * 2):
+            notifications._send(FakeClient(on_send=take_over), first, notifications.MAX_ATTEMPTS)
+
+        self.notification.refresh_from_db()
+        # Результат пишет новый владелец, старый не затирает его аренду
+        self.assertEqual(self.notification.status, Notification.Status.PENDING)
+        self.assertEqual(self.notification.attempts, 0)
+        self.assertEqual(self.notification.next_attempt_at, taken[0].next_attempt_at)
+
+    def test_deliver_pending_marks_sent(self):
+        client = FakeClient()
+        with mock.patch.object(notifications, 'get_client', return_value=client):
+            self.assertEqual(notifications.deliver_pending(), (1, 0))
+        self.notification.refresh_from_db()
+        self.assertEqual(self.notification.status, Notification.Status.SENT)
+        self.assertEqual(self.notification.delivered_to, '1')
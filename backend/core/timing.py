@@ -0,0 +1,100 @@
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from . import metrics
+
+# Замеры текущего запроса; None — запрос не попал в выборку, замеры ничего не стоят
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Разбивка времени одного запроса: длительности по метрикам и попадания в кэш"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.durations = {}  # метрика -> [секунд, раз]
+        self.cache = {}  # слой кэша -> [hit, miss]
+
+    def add(self, name, seconds):
+        item = self.durations.setdefault(name, [0.0, 0])
+        item[0] += seconds
+        item[1] += 1
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+    def header(self, total):
+        """Значение заголовка Server-Timing"""
+        parts = [f'total;dur={total * 1000:.1f}']
+        for name, (seconds, count) in self.durations.items():
+            parts.append(f'{name};dur={seconds * 1000:.1f};desc="{count}x"')
+        for layer, (hits, misses) in self.cache.items():
+            parts.append(f'cache-{layer};desc="{hits} hit {misses} miss"')
+        return ', '.join(parts)
+
+    def as_dict(self, total):
+        data = {'total_ms': round(total * 1000, 2)}
+        for name, (seconds, count) in self.durations.items():
+            data[f'{name}_ms'] = round(seconds * 1000, 2)
+            data[f'{name}_count'] = count
+        if self.cache:
+            data['cache'] = {layer: {'hit': hits, 'miss': misses} for layer, (hits, misses) in self.cache.items()}
+        return data
+
+    def log_line(self, **fields):
+        return json.dumps({**fields, **self.as_dict(self.total())}, separators=(',', ':'))
+
+
+def activate():
+    timings = RequestTimings()
+    return timings, _current.set(timings)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def measure(name):
+    """Время блока попадает в метрику name текущего запроса"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+
+def timed(name):
+    """Декоратор: время вызова функции — в метрику name"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with measure(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def record_cache(layer, hit):
+    metrics.CACHE_REQUESTS.inc(layer, 'hit' if hit else 'miss')
+    timings = _current.get()
+    if timings is not None:
+        counts = timings.cache.setdefault(layer, [0, 0])
+        counts[0 if hit else 1] += 1
+
+
+def db_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper: время и число SQL-запросов"""
+    with measure('db'):
+        return execute(sql, params, many, context)
@@ -14,6 +14,13 @@ urlpatterns = [
     path("api/contact/", views.contact_request, name="contact_request"),
     path("api/car-request/", views.car_request, name="car_request"),
     
+    # API каталога
+    path("api/cars/", views.cars_api, name="cars_api"),
+    path("api/search/", views.search_api, name="search_api"),
+    path("api/availability/", views.availability_api, name="availability_api"),
+    path("api/quote/", views.quote_api, name="quote_api"),
+    
     # Машины
+    path("tags/<str:tag_slug>/", views.tag_cars, name="tag_cars"),
     path("<slug:category_slug>/<slug:car_slug>/", views.car_detail, name="car_detail"),
 ]
\ No newline at end of file
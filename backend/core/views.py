@@ -1,15 +1,47 @@
+import datetime
+import hashlib
+import hmac
+import json
 import os
 import re
-import socket
 import requests
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
-from django.views.decorators.http import require_POST
-from django.views.decorators.vary import vary_on_headers
-from django.views.decorators.cache import cache_page
+from django.http import Http404, HttpResponse, JsonResponse
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.functional import SimpleLazyObject
+from django.utils.http import http_date
+from django.views.decorators.http import require_GET, require_POST
+
+from . import metrics
+from .cache import FLEET, RATES, RESERVATIONS, cache_catalog_page, get_version
+from .sitemaps import get_sitemap
+from .timing import record_cache
+from .services import (
+    BOOKINGS_HORIZON,
+    INVALID,
+    FleetQueryError,
+    busy_car_ids,
+    car_bookings,
+    check_email_domain,
+    enqueue_notification,
+    get_car_card,
+    get_car_cards,
+    get_car_cards_by_ids,
+    parse_date,
+    query_fleet,
+    query_tag,
+    quote_fleet,
+    search_cars,
+)
+
 
-from .models import Car
-from .services import send_telegram
+API_TIMEOUT = 60 * 60
 
 
 # === ВАЛИДАЦИЯ ===
@@ -20,12 +52,11 @@ def validate_email(email):
     if not re.match(pattern, email):
         return False, "Invalid email format"
     
+    # Таймаут или сбой DNS не должен стоить нам заявки — отклоняем только NXDOMAIN
     domain = email.split('@')[1]
-    try:
-        socket.gethostbyname(domain)
-        return True, None
-    except socket.gaierror:
+    if check_email_domain(domain) == INVALID:
         return False, "Email domain does not exist"
+    return True, None
 
 
 def validate_phone(phone):
@@ -72,7 +103,7 @@ def booking_request(request):
 📱 Phone: <a href="https://wa.me/{wa_phone}">{full_phone}</a>
 📧 Email: {email}"""
     
-    send_telegram(message)
+    enqueue_notification(message, 'booking')
     
     return JsonResponse({'success': True})
 
@@ -110,51 +141,221 @@ def contact_request(request):
 💬 Message:
 {message_text}"""
     
-    send_telegram(message)
+    enqueue_notification(message, 'contact')
     
     return JsonResponse({'success': True, 'message': 'Thank you! We will get back to you soon.'})
 
 
 # === СТРАНИЦЫ ===
 
+def _busy_today():
+    """Машины, занятые сегодня: один запрос на весь список и только при рендеринге"""
+    today = timezone.localdate()
+    return SimpleLazyObject(lambda: busy_car_ids(today, today + datetime.timedelta(days=1)))
+
+
+@cache_catalog_page()
 def index(request):
     """Главная страница с машинами из БД"""
-    cars = Car.objects.filter(is_active=True).select_related('category')[:6]
-    return render(request, "pages/index.html", {'cars': cars})
+    cars = get_car_cards()[:6]
+    return TemplateResponse(request, "pages/index.html", {'cars': cars, 'busy_ids': _busy_today()})
 
 
-@cache_page(60 * 15)
-@vary_on_headers("Accept-Language")
+@cache_catalog_page(60 * 15)
 def privacy(request):
-    return render(request, 'pages/privacy_policy.html')
+    return TemplateResponse(request, 'pages/privacy_policy.html')
 
 
-@cache_page(60 * 15)
-@vary_on_headers("Accept-Language")
+@cache_catalog_page(60 * 15)
 def cookies(request):
-    return render(request, 'pages/cookies.html')
+    return TemplateResponse(request, 'pages/cookies.html')
 
 
-@cache_page(60 * 15)
-@vary_on_headers("Accept-Language")
+@cache_catalog_page(60 * 15)
 def contacts(request):
-    return render(request, 'pages/contacts.html')
+    return TemplateResponse(request, 'pages/contacts.html')
 
 
-@cache_page(60 * 15)
-@vary_on_headers("Accept-Language")
+@cache_catalog_page(60 * 15)
 def faq(request):
-    return render(request, "pages/faq.html")
+    return TemplateResponse(request, "pages/faq.html")
 
 
+@cache_catalog_page()
 def car_detail(request, category_slug, car_slug):
-    car = get_object_or_404(
-        Car.objects.select_related('category'),
-        slug=car_slug,
-        category__slug=category_slug,
-        is_active=True
+    car = get_car_card(category_slug, car_slug)
+    if car is None:
+        raise Http404("Car not found")
+    today = timezone.localdate()
+    # Лениво: страница может прийти из кэша, тогда запроса не будет
+    horizon = today + datetime.timedelta(days=BOOKINGS_HORIZON)
+    # Для посетителя — последний занятый день, а не день возврата
+    bookings = SimpleLazyObject(lambda: [
+        (start, end - datetime.timedelta(days=1)) for start, end in car_bookings(car.id, today, horizon)
+    ])
+    similar = get_car_cards_by_ids(car.similar)
+    return TemplateResponse(request, "pages/car_detail.html", {"car": car, "bookings": bookings, "similar": similar})
+
+
+@cache_catalog_page()
+def tag_cars(request, tag_slug):
+    """Посадочная страница тега: все машины с тегом"""
+    tag_name, ids = query_tag(tag_slug)
+    cars = get_car_cards_by_ids(ids)
+    if not cars:
+        raise Http404("Tag not found")
+    return TemplateResponse(request, "pages/tag.html", {"tag_name": tag_name, "cars": cars, "busy_ids": _busy_today()})
+
+
+@require_GET
+def sitemap_xml(request):
+    """sitemap.xml из кэша с ETag/Last-Modified — краулеры получают 304 без запросов к БД"""
+    content, compressed, etag, last_modified = get_sitemap(request)
+
+    response = HttpResponse(content_type='application/xml')
+    if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+        response.content = compressed
+        response['Content-Encoding'] = 'gzip'
+        # Другие байты — другой сильный ETag, иначе кэш отдаст gzip клиенту без gzip
+        response['ETag'] = f'"{etag}-gz"'
+    else:
+        response.content = content
+        response['ETag'] = f'"{etag}"'
+    response['Last-Modified'] = http_date(last_modified)
+    patch_vary_headers(response, ('Accept-Encoding',))
+
+    return get_conditional_response(
+        request, etag=response['ETag'], last_modified=last_modified, response=response,
     )
-    return render(request, "pages/car_detail.html", {"car": car})
+
+
+def _card_json(request, card):
+    return {
+        'id': card.id,
+        'slug': card.slug,
+        'name': card.name,
+        'url': request.build_absolute_uri(card.url),
+        'category': card.category_slug,
+        'category_name': card.category_name,
+        'price_per_day': str(card.price_per_day),
+        'seats': card.seats,
+        'transmission': card.transmission,
+        'tags': list(card.tags),
+        'image': card.main_image.src if card.main_image else None,
+    }
+
+
+def _cached_json(request, name, build, depends=(FLEET,)):
+    """JSON-ответ API из кэша по версиям данных и query string, с ETag"""
+    query = urlencode(sorted(request.GET.items()))
+    key = 'core:api:{}:{}:{}'.format(
+        name,
+        '.'.join(str(get_version(namespace)) for namespace in depends),
+        hashlib.md5(f'{request.get_host()}?{query}'.encode()).hexdigest(),
+    )
+    cached = cache.get(key)
+    record_cache('api', cached is not None)
+    if cached is None:
+        try:
+            data = build()
+        except FleetQueryError as e:
+            return JsonResponse({'error': str(e)}, status=400)
+        content = json.dumps(data, ensure_ascii=False).encode()
+        cached = (content, hashlib.md5(content).hexdigest())
+        cache.set(key, cached, API_TIMEOUT)
+
+    content, etag = cached
+    response = HttpResponse(content, content_type='application/json')
+    response['ETag'] = f'"{etag}"'
+    patch_cache_control(response, public=True, max_age=60)
+    return get_conditional_response(request, etag=response['ETag'], response=response)
+
+
+@require_GET
+def cars_api(request):
+    """Автопарк в JSON: фильтры + keyset-пагинация"""
+    def build():
+        ids, next_cursor = query_fleet(request.GET)
+        results = [_card_json(request, card) for card in get_car_cards_by_ids(ids)]
+        return {'results': results, 'next': next_cursor}
+
+    return _cached_json(request, 'cars', build, depends=(FLEET, RESERVATIONS))
+
+
+@require_GET
+def availability_api(request):
+    """Свободные и занятые машины на даты [start, end) — одним запросом на весь автопарк"""
+    def build():
+        params = request.GET
+        start, end = parse_date(params, 'start'), parse_date(params, 'end')
+        if not (start and end) or end <= start:
+            raise FleetQueryError("start and end must form a date range")
+        busy = busy_car_ids(start, end)
+        cards = get_car_cards()
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'available': [card.id for card in cards if card.id not in busy],
+            'busy': [card.id for card in cards if card.id in busy],
+        }
+
+    return _cached_json(request, 'availability', build, depends=(FLEET, RESERVATIONS))
+
+
+@require_GET
+def quote_api(request):
+    """Стоимость аренды на [start, end) для всего автопарка или одной машины (car=id)"""
+    def build():
+        params = request.GET
+        start, end = parse_date(params, 'start'), parse_date(params, 'end')
+        if not (start and end) or end <= start:
+            raise FleetQueryError("start and end must form a date range")
+        if (end - start).days > settings.QUOTE_MAX_DAYS:
+            raise FleetQueryError(f"Maximum rental is {settings.QUOTE_MAX_DAYS} days")
+
+        quotes = quote_fleet(start, end).values()
+        if params.get('car'):
+            quotes = [quote for quote in quotes if str(quote.car_id) == params['car']]
+        return {
+            'start': start.isoformat(),
+            'end': end.isoformat(),
+            'days': (end - start).days,
+            'quotes': [{
+                'id': quote.car_id,
+                'total': str(quote.total),
+                'per_day': str(quote.per_day),
+                'discount_percent': str(quote.discount),
+            } for quote in quotes],
+        }
+
+    return _cached_json(request, 'quote', build, depends=(FLEET, RATES))
+
+
+@require_GET
+def search_api(request):
+    """Поиск по автопарку: название, описание, категория и теги"""
+    def build():
+        query = request.GET.get('q', '').strip()[:200]
+        results = [_card_json(request, card) for card in search_cars(query)]
+        return {'query': query, 'results': results}
+
+    return _cached_json(request, 'search', build)
+
+
+@require_GET
+def metrics_view(request):
+    """Метрики Prometheus, суммированные по всем процессам; доступ по Bearer-токену"""
+    token = settings.METRICS_TOKEN
+    if token:
+        if not hmac.compare_digest(request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'):
+            raise Http404
+    elif not settings.DEBUG:
+        raise Http404
+
+    response = HttpResponse(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+    patch_cache_control(response, no_store=True)
+    return response
+
 
 def error_404(request, exception):
     return render(request, '404.html', status=404)
@@ -190,6 +391,6 @@ def car_request(request):
 📱 Phone: <a href="https://wa.me/{wa_phone}">{full_phone}</a>
 📧 Email: {email}"""
     
-    send_telegram(message)
+    enqueue_notification(message, 'car_request')
     
     return JsonResponse({'success': True})
\ No newline at end of file